@@ -0,0 +1,179 @@
+"""Бенчмарк генерации и проверки ходов
+
+    python -m benchmarks.bench_moves --output bench.json
+    python -m benchmarks.bench_moves --compare bench.json
+
+Печатает (или пишет в файл) результаты в JSON; с --compare сравнивает с прошлым запуском
+и завершается с кодом 1, если что-то замедлилось больше порога.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+from game_logic.board_position import BoardPosition
+from game_logic.board_setup import STANDARD_START_FEN, board_from_fen, standard_board
+from game_logic.chess_board import ChessBoard
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.figure_abilities import (
+    RookMoveAbility,
+    BishopMoveAbility,
+    KnightMoveAbility,
+    QueenMoveAbility,
+    KingMoveAbility,
+    PawnMoveAbility,
+)
+from game_logic.perft import perft
+
+
+def minor_pieces_board() -> ChessBoard:
+    """Миттельшпиль из ладей, слонов и коней"""
+    return board_from_fen("r3r3/2b3b1/2n2n2/8/8/2N2N2/3B2B1/R4R2")
+
+
+def royal_board() -> ChessBoard:
+    """Ферзь, короли и пешки - фигуры, которых нет в minor_pieces_board"""
+    return board_from_fen("4k3/3p4/8/8/3Q4/8/4P3/4K3")
+
+
+def middlegame_board() -> ChessBoard:
+    """Миттельшпиль со всеми фигурами: шахи, связки и превращения пешек b7 и a2"""
+    return board_from_fen("r3k2r/1P1q1ppp/2n1bn2/1B1pp3/3PP3/2N1QN2/p4PPP/R3K2R")
+
+
+# (название, построение доски, глубина, эталонные числа perft по глубинам); числа для
+# миттельшпилей сверены с brute_force_perft из tests/test_perft.py
+PERFT_POSITIONS = [
+    ("start", standard_board, 3, [20, 400, 8902, 197281]),
+    ("minor_pieces", minor_pieces_board, 3, [41, 2001, 80125]),
+    ("middlegame", middlegame_board, 3, [43, 1603, 70110]),
+]
+
+
+def bench(name: str, statement, number: int) -> dict:
+    seconds = min(timeit.repeat(statement, number=number, repeat=5))
+    return {"name": name, "ns_per_op": seconds / number * 1e9, "ops_per_sec": number / seconds}
+
+
+def micro_benchmarks() -> list[dict]:
+    board = minor_pieces_board()
+    rook = board.get_figure_by_position(BoardPosition(0, 0))
+    bishop = board.get_figure_by_position(BoardPosition(3, 1))
+    knight = board.get_figure_by_position(BoardPosition(2, 2))
+    rook_ability, bishop_ability, knight_ability = RookMoveAbility(), BishopMoveAbility(), KnightMoveAbility()
+    target = BoardPosition(0, 5)
+    snapshot = board.snapshot()
+    game = ChessGame(board=minor_pieces_board(), time_units=1000)
+    game_rook = game.board.get_figure_by_position(BoardPosition(0, 0))
+    royal = royal_board()
+    queen = royal.get_figure_by_position(BoardPosition(3, 3))
+    king = royal.get_figure_by_position(BoardPosition(4, 0))
+    pawn = royal.get_figure_by_position(BoardPosition(4, 1))
+    queen_ability, king_ability, pawn_ability = QueenMoveAbility(), KingMoveAbility(), PawnMoveAbility()
+
+    def perform_and_unmake():
+        game.unmake_move(game.make_move(game_rook, rook_ability, target, 1))
+
+    return [
+        bench("get_figure_by_position", lambda: board.get_figure_by_position(target), 200000),
+        bench("rook.is_can_perform", lambda: rook_ability.is_can_perform(board, rook, target), 50000),
+        bench(
+            "bishop.is_can_perform",
+            lambda: bishop_ability.is_can_perform(board, bishop, BoardPosition(5, 3)),
+            50000,
+        ),
+        bench(
+            "knight.is_can_perform",
+            lambda: knight_ability.is_can_perform(board, knight, BoardPosition(3, 4)),
+            50000,
+        ),
+        bench(
+            "queen.is_can_perform",
+            lambda: queen_ability.is_can_perform(royal, queen, BoardPosition(6, 6)),
+            50000,
+        ),
+        bench(
+            "king.is_can_perform",
+            lambda: king_ability.is_can_perform(royal, king, BoardPosition(5, 1)),
+            50000,
+        ),
+        bench(
+            "pawn.is_can_perform",
+            lambda: pawn_ability.is_can_perform(royal, pawn, BoardPosition(4, 3)),
+            50000,
+        ),
+        bench("board.clone", board.clone, 5000),
+        bench("standard_board", standard_board, 5000),
+        bench("board_from_fen.start", lambda: board_from_fen(STANDARD_START_FEN), 5000),
+        bench("board.from_snapshot", lambda: ChessBoard.from_snapshot(snapshot), 5000),
+        bench("game.perform_move+unmake", perform_and_unmake, 20000),
+    ]
+
+
+def perft_benchmarks(max_depth: int | None) -> list[dict]:
+    results = []
+    for name, build_board, depth, expected in PERFT_POSITIONS:
+        if max_depth is not None:
+            depth = min(depth, max_depth)
+        board = build_board()
+        started = time.perf_counter()
+        nodes = perft(board, FigureColor.WHITE, depth)
+        seconds = time.perf_counter() - started
+        expected_nodes = expected[depth - 1]
+        results.append({
+            "name": f"perft.{name}.{depth}",
+            "nodes": nodes,
+            "expected": expected_nodes,
+            "ok": nodes == expected_nodes,
+            "seconds": seconds,
+            "nodes_per_sec": nodes / seconds if seconds else None,
+        })
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Имена бенчмарков, которые замедлились больше чем на threshold"""
+    previous = {item["name"]: item for item in baseline["micro"]}
+    regressions = []
+    for item in results["micro"]:
+        old = previous.get(item["name"])
+        if old is not None and item["ns_per_op"] > old["ns_per_op"] * (1 + threshold):
+            regressions.append(item["name"])
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="файл для JSON с результатами (по умолчанию stdout)")
+    parser.add_argument("--compare", help="JSON прошлого запуска")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление, доля")
+    parser.add_argument("--perft-depth", type=int, help="ограничить глубину perft")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "micro": micro_benchmarks(),
+        "perft": perft_benchmarks(args.perft_depth),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    failed = [item["name"] for item in results["perft"] if not item["ok"]]
+    if args.compare:
+        with open(args.compare) as file:
+            failed += compare(results, json.load(file), args.threshold)
+    if failed:
+        print("FAILED: " + ", ".join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
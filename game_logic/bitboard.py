@@ -0,0 +1,127 @@
+"""Битовые маски доски: клетка с номером square соответствует биту 1 << square"""
+from typing import Iterator
+
+from game_logic.board_position import BoardPosition
+
+
+BOARD_LEN = BoardPosition.BOARD_LEN
+BOARD_SIZE = BOARD_LEN * BOARD_LEN
+FULL_MASK = (1 << BOARD_SIZE) - 1
+
+# направления (dx, dy); первые четыре - ладейные, остальные - слоновьи
+DIRECTIONS = (
+    (0, 1), (0, -1), (1, 0), (-1, 0),
+    (1, 1), (1, -1), (-1, 1), (-1, -1),
+)
+ROOK_DIRECTIONS = (0, 1, 2, 3)
+BISHOP_DIRECTIONS = (4, 5, 6, 7)
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+KNIGHT_OFFSETS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_OFFSETS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+
+def lsb(mask: int) -> int:
+    """Номер младшего установленного бита"""
+    return (mask & -mask).bit_length() - 1
+
+
+def msb(mask: int) -> int:
+    """Номер старшего установленного бита"""
+    return mask.bit_length() - 1
+
+
+def iter_squares(mask: int) -> Iterator[int]:
+    """Лениво перебирает номера клеток маски по возрастанию"""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def build_leaper_table(offsets: tuple[tuple[int, int], ...]) -> tuple[int, ...]:
+    """Таблица атак прыгающей фигуры (конь, король или фигура варианта) для каждой клетки"""
+    table = []
+    for square in range(BOARD_SIZE):
+        x, y = square % BOARD_LEN, square // BOARD_LEN
+        mask = 0
+        for dx, dy in offsets:
+            to_x, to_y = x + dx, y + dy
+            if 0 <= to_x < BOARD_LEN and 0 <= to_y < BOARD_LEN:
+                mask |= 1 << (to_y * BOARD_LEN + to_x)
+        table.append(mask)
+    return tuple(table)
+
+
+def _build_rays() -> tuple[tuple[int, ...], ...]:
+    rays = []
+    for dx, dy in DIRECTIONS:
+        direction_rays = []
+        for square in range(BOARD_SIZE):
+            x, y = square % BOARD_LEN + dx, square // BOARD_LEN + dy
+            mask = 0
+            while 0 <= x < BOARD_LEN and 0 <= y < BOARD_LEN:
+                mask |= 1 << (y * BOARD_LEN + x)
+                x, y = x + dx, y + dy
+            direction_rays.append(mask)
+        rays.append(tuple(direction_rays))
+    return tuple(rays)
+
+
+# RAYS[direction][square] - все клетки луча от square (без неё самой) на пустой доске
+RAYS = _build_rays()
+# луч идёт в сторону возрастания номеров клеток
+RAY_IS_POSITIVE = tuple(dy > 0 or (dy == 0 and dx > 0) for dx, dy in DIRECTIONS)
+
+KNIGHT_ATTACKS = build_leaper_table(KNIGHT_OFFSETS)
+KING_ATTACKS = build_leaper_table(KING_OFFSETS)
+
+
+def _build_between() -> tuple[tuple[int, ...], ...]:
+    between = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for direction_rays in RAYS:
+        for from_square in range(BOARD_SIZE):
+            ray = direction_rays[from_square]
+            for to_square in iter_squares(ray):
+                between[from_square][to_square] = ray & ~direction_rays[to_square] & ~(1 << to_square)
+    return tuple(tuple(row) for row in between)
+
+
+# BETWEEN[from][to] - клетки строго между from и to, если они на одной линии или диагонали, иначе 0
+BETWEEN = _build_between()
+# белые пешки идут в сторону роста y, черные - наоборот
+WHITE_PAWN_ATTACKS = build_leaper_table(((1, 1), (-1, 1)))
+BLACK_PAWN_ATTACKS = build_leaper_table(((1, -1), (-1, -1)))
+# тихие ходы пешки; двойной шаг возможен только с начальной горизонтали (y=1 у белых, y=6 у черных)
+WHITE_PAWN_PUSHES = build_leaper_table(((0, 1),))
+BLACK_PAWN_PUSHES = build_leaper_table(((0, -1),))
+WHITE_PAWN_DOUBLE_PUSHES = tuple(
+    1 << (square + 2 * BOARD_LEN) if square // BOARD_LEN == 1 else 0 for square in range(BOARD_SIZE)
+)
+BLACK_PAWN_DOUBLE_PUSHES = tuple(
+    1 << (square - 2 * BOARD_LEN) if square // BOARD_LEN == BOARD_LEN - 2 else 0 for square in range(BOARD_SIZE)
+)
+# последняя горизонталь, дойдя до которой пешка превращается
+WHITE_PROMOTION_RANK = (1 << BOARD_LEN) - 1 << (BOARD_SIZE - BOARD_LEN)
+BLACK_PROMOTION_RANK = (1 << BOARD_LEN) - 1
+
+
+def sliding_attacks(square: int, occupied: int, directions: tuple[int, ...]) -> int:
+    """Атаки дальнобойной фигуры: каждый луч обрезается на первой занятой клетке (включительно)"""
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            blocker = lsb(blockers) if RAY_IS_POSITIVE[direction] else msb(blockers)
+            ray ^= RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    return sliding_attacks(square, occupied, ROOK_DIRECTIONS)
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    return sliding_attacks(square, occupied, BISHOP_DIRECTIONS)
@@ -2,25 +2,72 @@ from game_logic.exceptions import OutOfBoardException
 
 
 class BoardPosition:
-    """класс представляющий координаты фигуры"""
+    """класс представляющий координаты фигуры
+
+    Позиции неизменяемые и интернированы: на каждую из 64 клеток есть ровно один объект,
+    поэтому BoardPosition(x, y) ничего не создаёт, а позицию можно использовать как ключ словаря.
+    """
     BOARD_LEN = 8
+    __slots__ = ("x", "y", "index")
+    _positions: tuple["BoardPosition", ...] = ()
+
+    def __new__(cls, x: int, y: int) -> "BoardPosition":
+        cls.check_coords_in_board(x, y)
+        return cls._positions[y * cls.BOARD_LEN + x]
 
-    def __init__(self, x: int, y: int):
-        self.check_coords_in_board(x, y)
-        self.x = x
-        self.y = y
+    @classmethod
+    def of(cls, x: int, y: int) -> "BoardPosition":
+        cls.check_coords_in_board(x, y)
+        return cls._positions[y * cls.BOARD_LEN + x]
+
+    @classmethod
+    def from_index(cls, index: int) -> "BoardPosition":
+        """Позиция по номеру клетки index = y * BOARD_LEN + x"""
+        if not 0 <= index < cls.BOARD_LEN * cls.BOARD_LEN:
+            raise OutOfBoardException
+        return cls._positions[index]
 
-    def check_coords_in_board(self, x: int, y: int) -> None:
-        if x not in range(0, self.BOARD_LEN):
+    @classmethod
+    def check_coords_in_board(cls, x: int, y: int) -> None:
+        if not 0 <= x < cls.BOARD_LEN:
             raise OutOfBoardException
-        if y not in range(0, self.BOARD_LEN):
+        if not 0 <= y < cls.BOARD_LEN:
             raise OutOfBoardException
 
-    def __eq__(self, other) -> bool:
-        return self.x == other.x and self.y == other.y
+    def __setattr__(self, key, value):
+        raise AttributeError("BoardPosition is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("BoardPosition is immutable")
+
+    def __hash__(self) -> int:
+        return self.index
+
+    def __reduce__(self):
+        return BoardPosition.from_index, (self.index,)
+
+    def __copy__(self) -> "BoardPosition":
+        return self
+
+    def __deepcopy__(self, memo) -> "BoardPosition":
+        return self
 
     def __str__(self):
         return f"Position ({self.x}, {self.y})"
 
     def __repr__(self):
         return self.__str__()
+
+
+def _build_positions() -> tuple[BoardPosition, ...]:
+    positions = []
+    for index in range(BoardPosition.BOARD_LEN * BoardPosition.BOARD_LEN):
+        position = object.__new__(BoardPosition)
+        object.__setattr__(position, "x", index % BoardPosition.BOARD_LEN)
+        object.__setattr__(position, "y", index // BoardPosition.BOARD_LEN)
+        object.__setattr__(position, "index", index)
+        positions.append(position)
+    return tuple(positions)
+
+
+BoardPosition._positions = _build_positions()
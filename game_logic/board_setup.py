@@ -0,0 +1,121 @@
+"""Быстрая расстановка фигур: FEN-подобная строка и компактный ключ
+
+FEN здесь - только расстановка и, для игры, очередь хода: "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w".
+Горизонтали идут сверху вниз (от y=7 к y=0), внутри горизонтали - от x=0; заглавные буквы -
+белые фигуры (см. Figure.symbol), цифры - число пустых клеток. Компактный ключ - снапшот доски
+в hex (128 символов); он подходит и для фигур без буквы.
+
+Обе загрузки собирают снапшот и разворачивают его через ChessBoard.from_snapshot, так что
+BoardFigure по одной не создаются и проверка пересечений не нужна.
+"""
+from functools import cache
+
+from game_logic.bitboard import BOARD_LEN, BOARD_SIZE
+from game_logic.chess_board import ChessBoard
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.registry import FIGURES
+from game_logic.time_control import TimeControl
+
+STANDARD_START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
+
+
+class BadFenException(Exception):
+    """Строка не разбирается как расстановка"""
+
+
+def _figure_codes() -> dict[str, int]:
+    # реестр может пополняться (пользовательские фигуры), поэтому таблица строится при каждом разборе
+    return {figure_type.symbol: figure_type.type_id for figure_type in FIGURES.types if figure_type.symbol}
+
+
+def fen_to_snapshot(placement: str) -> bytes:
+    codes = _figure_codes()
+    snapshot = bytearray(BOARD_SIZE)
+    ranks = placement.split("/")
+    if len(ranks) != BOARD_LEN:
+        raise BadFenException(placement)
+    for row, rank in enumerate(ranks):
+        y = BOARD_LEN - 1 - row
+        x = 0
+        for char in rank:
+            if char.isdigit():
+                x += int(char)
+                continue
+            code = codes.get(char.upper())
+            if code is None or x >= BOARD_LEN:
+                raise BadFenException(placement)
+            snapshot[y * BOARD_LEN + x] = code if char.isupper() else -code & 0xFF
+            x += 1
+        if x != BOARD_LEN:
+            raise BadFenException(placement)
+    return bytes(snapshot)
+
+
+def board_from_fen(placement: str) -> ChessBoard:
+    return ChessBoard.from_snapshot(fen_to_snapshot(placement))
+
+
+def board_to_fen(board: ChessBoard) -> str:
+    ranks = []
+    for y in range(BOARD_LEN - 1, -1, -1):
+        rank = ""
+        empty = 0
+        for x in range(BOARD_LEN):
+            figure = board.squares[y * BOARD_LEN + x]
+            if figure is None:
+                empty += 1
+                continue
+            symbol = figure.figure.symbol
+            if symbol is None:
+                raise ValueError(f"{type(figure.figure).__name__} has no FEN symbol, use compact_key")
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += symbol if figure.color == FigureColor.WHITE else symbol.lower()
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+    return "/".join(ranks)
+
+
+def game_from_fen(fen: str, time_units: int, time_control: TimeControl | None = None) -> ChessGame:
+    """Игра по строке "расстановка [w|b]"; по умолчанию ходят белые"""
+    fields = fen.split()
+    if not 1 <= len(fields) <= 2 or (len(fields) == 2 and fields[1] not in ("w", "b")):
+        raise BadFenException(fen)
+    game = ChessGame(board=board_from_fen(fields[0]), time_units=time_units, time_control=time_control)
+    if len(fields) == 2 and fields[1] == "b":
+        game.side_to_move = FigureColor.BLACK
+    return game
+
+
+def game_to_fen(game: ChessGame) -> str:
+    return f"{board_to_fen(game.board)} {'w' if game.side_to_move == FigureColor.WHITE else 'b'}"
+
+
+def compact_key(board: ChessBoard) -> str:
+    return board.snapshot().hex()
+
+
+def board_from_compact_key(key: str) -> ChessBoard:
+    try:
+        snapshot = bytes.fromhex(key)
+    except ValueError:
+        raise BadFenException(key)
+    if len(snapshot) != BOARD_SIZE:
+        raise BadFenException(key)
+    try:
+        return ChessBoard.from_snapshot(snapshot)
+    except KeyError:
+        raise BadFenException(key)
+
+
+@cache
+def _standard_board() -> ChessBoard:
+    return board_from_fen(STANDARD_START_FEN)
+
+
+def standard_board() -> ChessBoard:
+    """Начальная позиция; разбирается один раз, дальше отдаются копии (ChessBoard.clone)"""
+    return _standard_board().clone()
@@ -0,0 +1,150 @@
+"""Рассылка ходов зрителям
+
+Каждый ход сериализуется один раз в компактную дельту DELTA и кладётся в кольцевой
+буфер канала игры. Зрители не имеют своих очередей: у каждого только курсор в общем
+буфере, поэтому стоимость публикации не зависит от числа зрителей. Зритель, отставший
+больше чем на max_lag дельт, получает SubscriberLagged и пересинхронизируется по
+снапшоту игры (encode_snapshot); слишком часто отстающих можно отключать.
+"""
+import asyncio
+import struct
+from typing import NamedTuple
+
+from game_logic.chess_game import ChessGame, MoveRecord
+from game_logic.constants import FigureColor
+
+# версия игры, вид сообщения, откуда, куда, type_id абилки, код побитой фигуры (как в снапшоте доски, 0 - нет),
+# время белых, время черных
+DELTA = struct.Struct("<IBBBBBii")
+# версия игры, вид сообщения; дальше снапшот ChessGame
+SNAPSHOT_PREFIX = struct.Struct("<IB")
+
+KIND_MOVE = 0
+KIND_FLAG = 1
+KIND_SNAPSHOT = 2
+
+
+class Delta(NamedTuple):
+    version: int
+    kind: int
+    from_square: int
+    to_square: int
+    ability_id: int
+    captured_code: int
+    white_time: int
+    black_time: int
+
+
+class SubscriberLagged(Exception):
+    """Зритель отстал больше, чем хранит буфер канала; нужна пересинхронизация по снапшоту"""
+
+
+def encode_move(version: int, record: MoveRecord, game: ChessGame) -> bytes:
+    captured = record.captured
+    if captured is None:
+        captured_code = 0
+    elif captured.color == FigureColor.WHITE:
+        captured_code = captured.figure.type_id
+    else:
+        captured_code = -captured.figure.type_id & 0xFF
+    return DELTA.pack(
+        version,
+        KIND_MOVE,
+        record.from_position.index,
+        record.to_position.index,
+        record.ability.type_id,
+        captured_code,
+        game.white_time,
+        game.black_time,
+    )
+
+
+def encode_flag(version: int, game: ChessGame) -> bytes:
+    """Падение флага: клетка "откуда" - 0 для белых, 1 для черных"""
+    return DELTA.pack(
+        version, KIND_FLAG, game.flagged == FigureColor.BLACK, 0, 0, 0, game.white_time, game.black_time
+    )
+
+
+def encode_snapshot(version: int, game: ChessGame) -> bytes:
+    return SNAPSHOT_PREFIX.pack(version, KIND_SNAPSHOT) + game.snapshot()
+
+
+def decode_delta(payload: bytes) -> Delta:
+    return Delta(*DELTA.unpack(payload))
+
+
+class GameChannel:
+    """Канал одной игры: кольцевой буфер последних capacity дельт"""
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._buffer: list[bytes | None] = [None] * capacity
+        # номер следующей дельты; дельта n лежит в _buffer[n % capacity]
+        self.sequence = 0
+        self._published = asyncio.Event()
+        self.closed = False
+
+    def publish(self, payload: bytes) -> None:
+        self._buffer[self.sequence % self.capacity] = payload
+        self.sequence += 1
+        published, self._published = self._published, asyncio.Event()
+        published.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._published.set()
+
+    def subscribe(self, max_lag: int | None = None) -> "Subscriber":
+        return Subscriber(self, max_lag or self.capacity)
+
+
+class Subscriber:
+    """Курсор зрителя в канале"""
+    def __init__(self, channel: GameChannel, max_lag: int):
+        self.channel = channel
+        self.max_lag = min(max_lag, channel.capacity)
+        self.cursor = channel.sequence
+        self.resyncs = 0
+
+    async def next(self) -> bytes | None:
+        """Следующая дельта; None - канал закрыт"""
+        channel = self.channel
+        while self.cursor == channel.sequence:
+            if channel.closed:
+                return None
+            await channel._published.wait()
+        if channel.sequence - self.cursor > self.max_lag:
+            raise SubscriberLagged
+        payload = channel._buffer[self.cursor % channel.capacity]
+        self.cursor += 1
+        return payload
+
+    def resync(self) -> None:
+        """Перескакивает к концу канала; вызывающий отправляет зрителю снапшот текущей позиции"""
+        self.cursor = self.channel.sequence
+        self.resyncs += 1
+
+
+class BroadcastHub:
+    """Каналы всех игр процесса"""
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._channels: dict[str, GameChannel] = {}
+
+    def channel(self, game_id: str) -> GameChannel:
+        channel = self._channels.get(game_id)
+        if channel is None:
+            channel = self._channels[game_id] = GameChannel(self.capacity)
+        return channel
+
+    def get(self, game_id: str) -> GameChannel | None:
+        """Канал игры, если у неё есть зрители; иначе дельты можно не сериализовать"""
+        return self._channels.get(game_id)
+
+    def close(self, game_id: str) -> None:
+        channel = self._channels.pop(game_id, None)
+        if channel is not None:
+            channel.close()
+
+    def __len__(self) -> int:
+        return len(self._channels)
@@ -1,39 +1,315 @@
-from game_logic.figures import Figure
+from typing import Iterator
+
+from game_logic.figures import (
+    Figure,
+    RookFigure,
+    BishopFigure,
+    KnightFigure,
+    QueenFigure,
+    KingFigure,
+    PawnFigure,
+)
+from game_logic.registry import FIGURES
 from game_logic.board_position import BoardPosition
 from game_logic.constants import FigureColor
-from game_logic.figure_abilities import Ability
+from game_logic.figure_abilities import Ability, MoveAbility
 from game_logic.exceptions import SamePositionException
+from game_logic.bitboard import (
+    BOARD_SIZE,
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    WHITE_PAWN_ATTACKS,
+    BLACK_PAWN_ATTACKS,
+    WHITE_PROMOTION_RANK,
+    BLACK_PROMOTION_RANK,
+    iter_squares,
+    lsb,
+    rook_attacks,
+    bishop_attacks,
+)
+from game_logic.zobrist import get_figure_keys
+
+
+STANDARD_FIGURE_TYPES = (RookFigure, BishopFigure, KnightFigure, QueenFigure, KingFigure, PawnFigure)
+PAWN_ATTACKS = {FigureColor.WHITE: WHITE_PAWN_ATTACKS, FigureColor.BLACK: BLACK_PAWN_ATTACKS}
+PROMOTION_RANKS = {FigureColor.WHITE: WHITE_PROMOTION_RANK, FigureColor.BLACK: BLACK_PROMOTION_RANK}
+# пешка, дошедшая до последней горизонтали, всегда становится ферзём
+PROMOTION_FIGURE = QueenFigure
 
 
 class BoardFigure:
-    """Шахматная фигура на доске"""
+    """Шахматная фигура на доске; позиция хранится номером клетки"""
+    __slots__ = ("figure", "square", "color", "is_dead", "promoted_at")
+
     def __init__(self, figure: Figure, position: BoardPosition, color: FigureColor):
         self.figure = figure
-        self.position = position
+        self.square = position.index
         self.color = color
         self.is_dead = False
+        # номер хода доски (ChessBoard.ply), на котором пешка превратилась; нужен для отмены
+        self.promoted_at: int | None = None
+
+    @property
+    def position(self) -> BoardPosition:
+        return BoardPosition.from_index(self.square)
+
+    @position.setter
+    def position(self, position: BoardPosition) -> None:
+        self.square = position.index
 
 
 class ChessBoard:
     """Представляет из себя состояние доски"""
     def __init__(self, figures: list[BoardFigure] | None = None):
-        if figures is None:
-            self.figures = []
-        else:
+        self._reset()
+        if figures is not None:
             self.check_figures_position_collision(figures)
-            self.figures = figures
+        for figure in figures or ():
+            if figure.is_dead:
+                self.captured.append(figure)
+            else:
+                self.figures.append(figure)
+                self._place_figure(figure, figure.square)
 
-    def get_figure_by_position(self, position: BoardPosition) -> BoardFigure | None:
+    def _reset(self) -> None:
+        self.squares: list[BoardFigure | None] = [None] * BOARD_SIZE
+        self.occupied = 0
+        self.color_masks: dict[FigureColor, int] = {color: 0 for color in FigureColor}
+        self.figure_masks: dict[type[Figure], int] = {}
+        # живые фигуры; побитые переносятся в captured и возвращаются при отмене хода
+        self.figures: list[BoardFigure] = []
+        self.captured: list[BoardFigure] = []
+        # место побитой фигуры в figures: отмена хода возвращает её туда же, чтобы порядок figures не менялся
+        self._captured_indexes: dict[BoardFigure, int] = {}
+        # число сделанных и не отменённых move_figure
+        self.ply = 0
+        # Zobrist-ключ расстановки фигур, обновляется при каждом перемещении
+        self.zobrist_key = 0
+
+    def snapshot(self) -> bytes:
+        """Компактный снимок доски: 64 байта, код фигуры (type_id фигуры) со знаком цвета, 0 - пусто"""
+        codes = bytearray(BOARD_SIZE)
+        for square in iter_squares(self.occupied):
+            figure = self.squares[square]
+            code = figure.figure.type_id
+            codes[square] = code if figure.color == FigureColor.WHITE else -code & 0xFF
+        return bytes(codes)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: bytes) -> "ChessBoard":
+        board = cls.__new__(cls)
+        board.load_snapshot(snapshot)
+        return board
+
+    def clone(self) -> "ChessBoard":
+        """Независимая копия расстановки без истории ходов
+
+        Снапшот не разбирается: фигуры копируются напрямую, маски и Zobrist-ключ переносятся как есть.
+        """
+        board = self.__class__.__new__(self.__class__)
+        squares: list[BoardFigure | None] = [None] * BOARD_SIZE
+        figures = []
         for figure in self.figures:
-            if not figure.is_dead and figure.position == position:
-                return figure
-        return None
+            copy = BoardFigure.__new__(BoardFigure)
+            copy.figure = figure.figure
+            copy.square = figure.square
+            copy.color = figure.color
+            copy.is_dead = False
+            copy.promoted_at = None
+            squares[figure.square] = copy
+            figures.append(copy)
+        board.squares = squares
+        board.occupied = self.occupied
+        board.color_masks = dict(self.color_masks)
+        board.figure_masks = dict(self.figure_masks)
+        board.figures = figures
+        board.captured = []
+        board._captured_indexes = {}
+        board.ply = 0
+        board.zobrist_key = self.zobrist_key
+        return board
+
+    def load_snapshot(self, snapshot: bytes) -> None:
+        """Заменяет состояние доски снапшотом, не создавая новую доску"""
+        self._reset()
+        for square, code in enumerate(snapshot):
+            if not code:
+                continue
+            if code < 0x80:
+                color = FigureColor.WHITE
+            else:
+                color = FigureColor.BLACK
+                code = 0x100 - code
+            figure = BoardFigure(
+                figure=FIGURES.get(code)(), position=BoardPosition.from_index(square), color=color
+            )
+            self.figures.append(figure)
+            self._place_figure(figure, square)
+
+    def get_figure_by_position(self, position: BoardPosition) -> BoardFigure | None:
+        return self.squares[position.index]
+
+    def get_figure_by_square(self, square: int) -> BoardFigure | None:
+        return self.squares[square]
+
+    def get_figures_mask(self, figure_type: type[Figure], color: FigureColor) -> int:
+        """Маска клеток с фигурами данного типа и цвета"""
+        return self.figure_masks.get(figure_type, 0) & self.color_masks[color]
+
+    def add_figure(self, figure: BoardFigure) -> None:
+        square = figure.square
+        if self.squares[square] is not None:
+            raise SamePositionException
+        self.figures.append(figure)
+        self._place_figure(figure, square)
+
+    def move_figure(self, figure: BoardFigure, to_pos: BoardPosition) -> BoardFigure | None:
+        """Передвигает фигуру без проверок, возвращает побитую фигуру; пешку на последней горизонтали превращает"""
+        to_square = to_pos.index
+        to_figure = self.squares[to_square]
+        if to_figure is not None:
+            to_figure.is_dead = True
+            self._remove_figure(to_figure, to_square)
+            index = self.figures.index(to_figure)
+            del self.figures[index]
+            self._captured_indexes[to_figure] = index
+            self.captured.append(to_figure)
+        self._remove_figure(figure, figure.square)
+        self.ply += 1
+        if type(figure.figure) is PawnFigure and PROMOTION_RANKS[figure.color] >> to_square & 1:
+            figure.figure = PROMOTION_FIGURE()
+            figure.promoted_at = self.ply
+        self._place_figure(figure, to_square)
+        figure.square = to_square
+        return to_figure
+
+    def unmove_figure(self, figure: BoardFigure, from_pos: BoardPosition, captured: BoardFigure | None) -> None:
+        """Отменяет move_figure: возвращает фигуру на from_pos и восстанавливает побитую"""
+        to_square = figure.square
+        self._remove_figure(figure, to_square)
+        if figure.promoted_at == self.ply:
+            figure.figure = PawnFigure()
+            figure.promoted_at = None
+        self.ply -= 1
+        self._place_figure(figure, from_pos.index)
+        figure.square = from_pos.index
+        if captured is not None:
+            captured.is_dead = False
+            # ходы отменяются в обратном порядке, так что побитая фигура обычно последняя в captured
+            if self.captured[-1] is captured:
+                self.captured.pop()
+            else:
+                self.captured.remove(captured)
+            self.figures.insert(self._captured_indexes.pop(captured, len(self.figures)), captured)
+            self._place_figure(captured, to_square)
+
+    def _place_figure(self, figure: BoardFigure, square: int) -> None:
+        bit = 1 << square
+        figure_type = type(figure.figure)
+        self.squares[square] = figure
+        self.occupied |= bit
+        self.color_masks[figure.color] |= bit
+        self.figure_masks[figure_type] = self.figure_masks.get(figure_type, 0) | bit
+        self.zobrist_key ^= get_figure_keys(figure_type, figure.color)[square]
+
+    def _remove_figure(self, figure: BoardFigure, square: int) -> None:
+        bit = 1 << square
+        figure_type = type(figure.figure)
+        self.squares[square] = None
+        self.occupied &= ~bit
+        self.color_masks[figure.color] &= ~bit
+        self.figure_masks[figure_type] &= ~bit
+        self.zobrist_key ^= get_figure_keys(figure_type, figure.color)[square]
+
+    def is_square_attacked(self, square: int, by_color: FigureColor) -> bool:
+        """Бьёт ли сторона by_color клетку: обратный поиск по таблицам атак, без перебора фигур"""
+        color_mask = self.color_masks[by_color]
+        masks = self.figure_masks
+        if KNIGHT_ATTACKS[square] & masks.get(KnightFigure, 0) & color_mask:
+            return True
+        if KING_ATTACKS[square] & masks.get(KingFigure, 0) & color_mask:
+            return True
+        if PAWN_ATTACKS[by_color.opposite][square] & masks.get(PawnFigure, 0) & color_mask:
+            return True
+        queens = masks.get(QueenFigure, 0)
+        if rook_attacks(square, self.occupied) & (masks.get(RookFigure, 0) | queens) & color_mask:
+            return True
+        if bishop_attacks(square, self.occupied) & (masks.get(BishopFigure, 0) | queens) & color_mask:
+            return True
+        for figure_type, mask in masks.items():
+            if figure_type not in STANDARD_FIGURE_TYPES and mask & color_mask:
+                for figure_square in iter_squares(mask & color_mask):
+                    if self._get_figure_attacks(self.squares[figure_square]) >> square & 1:
+                        return True
+        return False
+
+    def attack_map(self, color: FigureColor) -> int:
+        """Маска всех клеток, которые бьёт сторона color; считается заново при каждом вызове"""
+        attack_map = 0
+        for square in iter_squares(self.color_masks[color]):
+            attack_map |= self._get_figure_attacks(self.squares[square])
+        return attack_map
+
+    def _get_figure_attacks(self, figure: BoardFigure) -> int:
+        figure_type = type(figure.figure)
+        square = figure.square
+        if figure_type is KnightFigure:
+            return KNIGHT_ATTACKS[square]
+        if figure_type is KingFigure:
+            return KING_ATTACKS[square]
+        if figure_type is PawnFigure:
+            return PAWN_ATTACKS[figure.color][square]
+        if figure_type is RookFigure:
+            return rook_attacks(square, self.occupied)
+        if figure_type is BishopFigure:
+            return bishop_attacks(square, self.occupied)
+        if figure_type is QueenFigure:
+            return rook_attacks(square, self.occupied) | bishop_attacks(square, self.occupied)
+        attacks = 0
+        for ability_class in figure_type.abilities:
+            if issubclass(ability_class, MoveAbility):
+                attacks |= ability_class().get_attacks_mask(self, figure)
+        return attacks
+
+    def is_in_check(self, color: FigureColor) -> bool:
+        """Под боем ли король стороны color (если короля нет - нет и шаха)"""
+        kings = self.get_figures_mask(KingFigure, color)
+        return bool(kings) and self.is_square_attacked(lsb(kings), color.opposite)
+
+    def legal_moves(self, figure: BoardFigure) -> Iterator[tuple[BoardFigure, type[MoveAbility], BoardPosition]]:
+        """Лениво перебирает ходы фигуры в виде (фигура, класс абилки, позиция)
+
+        Ходы, после которых свой король оказывается под шахом, пропускаются.
+        """
+        has_king = bool(self.get_figures_mask(KingFigure, figure.color))
+        from_pos = figure.position
+        for ability_class in figure.figure.abilities:
+            if not issubclass(ability_class, MoveAbility):
+                continue
+            moves_mask = ability_class().get_moves_mask(self, figure)
+            for square in iter_squares(moves_mask):
+                to_pos = BoardPosition.from_index(square)
+                if has_king:
+                    captured = self.move_figure(figure, to_pos)
+                    in_check = self.is_in_check(figure.color)
+                    self.unmove_figure(figure, from_pos, captured)
+                    if in_check:
+                        continue
+                yield figure, ability_class, to_pos
+
+    def all_legal_moves(self, color: FigureColor) -> Iterator[tuple[BoardFigure, type[MoveAbility], BoardPosition]]:
+        """Лениво перебирает ходы всех живых фигур цвета"""
+        for square in iter_squares(self.color_masks[color]):
+            yield from self.legal_moves(self.squares[square])
 
     def check_figures_position_collision(self, figures: list[BoardFigure]) -> None:
-        for figure1 in figures:
-            for figure2 in figures:
-                if figure1 != figure2 and figure1.position == figure2.position:
-                    raise SamePositionException
+        """Один проход с маской занятых клеток вместо попарного сравнения"""
+        occupied = 0
+        for figure in figures:
+            bit = 1 << figure.square
+            if occupied & bit:
+                raise SamePositionException
+            occupied |= bit
 
     def perform_action(self, figure: BoardFigure, ability: Ability, to_position: BoardPosition) -> None:
         ability.perform(self, figure, to_position)
@@ -1,18 +1,145 @@
+import struct
+from typing import NamedTuple
+
 from game_logic.chess_board import ChessBoard, BoardFigure
 from game_logic.figure_abilities import Ability
 from game_logic.board_position import BoardPosition
 from game_logic.constants import FigureColor
+from game_logic.exceptions import TimeOverException, WrongTurnException
+from game_logic.time_control import MoveTimeLog, TimeControl
+from game_logic.zobrist import BLACK_TO_MOVE_KEY, clock_key
+
+
+class MoveRecord(NamedTuple):
+    """Запись для отмены хода"""
+    figure: BoardFigure
+    ability: type[Ability]
+    from_position: BoardPosition
+    to_position: BoardPosition
+    time_units: int
+    captured: BoardFigure | None
+    white_time: int
+    black_time: int
+    side_to_move: FigureColor
 
 
 class ChessGame:
     """Класс управления игрой"""
-    def __init__(self, board: ChessBoard, time_units: int):
+    # заголовок снапшота: время белых, время черных, чей ход (0 - белые, 1 - черные),
+    # добавка и задержка контроля времени
+    SNAPSHOT_HEADER = struct.Struct("<iiBii")
+
+    def __init__(self, board: ChessBoard, time_units: int, time_control: TimeControl | None = None):
         self.white_time = time_units
         self.black_time = time_units
         self.board = board
+        self.side_to_move = FigureColor.WHITE
+        self.undo_stack: list[MoveRecord] = []
+        self.time_control = time_control or TimeControl()
+        self.time_log = MoveTimeLog()
+        # сторона, у которой упал флаг; после этого ходы не принимаются
+        self.flagged: FigureColor | None = None
+
+    def perform_move(
+        self, figure: BoardFigure, ability: Ability, to_position: BoardPosition, time_units: int
+    ) -> MoveRecord:
+        return self.make_move(figure, ability, to_position, time_units)
 
-    def perform_move(self, figure: BoardFigure, ability: Ability, to_position: BoardPosition, time_units: int):
+    def make_move(
+        self, figure: BoardFigure, ability: Ability, to_position: BoardPosition, time_units: int
+    ) -> MoveRecord:
+        """Делает ход и списывает время, возвращает запись для unmake_move"""
+        if self.flagged is not None:
+            raise TimeOverException
+        if figure.color != self.side_to_move:
+            raise WrongTurnException
+        record = MoveRecord(
+            figure,
+            type(ability),
+            figure.position,
+            to_position,
+            time_units,
+            self.board.get_figure_by_position(to_position),
+            self.white_time,
+            self.black_time,
+            self.side_to_move,
+        )
+        ability.perform(self.board, figure, to_position)
         if figure.color == FigureColor.WHITE:
-            self.white_time -= time_units
-        elif figure.color == FigureColor.BLACK:
-            self.black_time -= time_units
+            self.white_time, spent = self.time_control.spend(self.white_time, time_units)
+            time_left = self.white_time
+        else:
+            self.black_time, spent = self.time_control.spend(self.black_time, time_units)
+            time_left = self.black_time
+        if time_left < 0:
+            self.flagged = figure.color
+        self.side_to_move = figure.color.opposite
+        self.time_log.append(spent)
+        self.undo_stack.append(record)
+        return record
+
+    def unmake_move(self, record: MoveRecord | None = None) -> MoveRecord:
+        """Отменяет последний ход; record, если передан, должен быть последним сделанным ходом"""
+        if not self.undo_stack or (record is not None and self.undo_stack[-1] is not record):
+            raise ValueError("Only the last move can be unmade")
+        record = self.undo_stack.pop()
+        self.board.unmove_figure(record.figure, record.from_position, record.captured)
+        self.white_time = record.white_time
+        self.black_time = record.black_time
+        self.side_to_move = record.side_to_move
+        self.time_log.pop()
+        # ход принимается только до падения флага, значит до него флага не было
+        self.flagged = None
+        return record
+
+    def flag_fall(self, color: FigureColor) -> None:
+        """Фиксирует падение флага по реальным часам (см. time_control.FlagScheduler)"""
+        if self.flagged is None and color == self.side_to_move:
+            self.flagged = color
+
+    @property
+    def board_key(self) -> int:
+        """64-битный ключ расстановки фигур и очереди хода, без учёта часов"""
+        if self.side_to_move == FigureColor.BLACK:
+            return self.board.zobrist_key ^ BLACK_TO_MOVE_KEY
+        return self.board.zobrist_key
+
+    @property
+    def position_key(self) -> int:
+        """64-битный ключ позиции: фигуры, очередь хода и время на часах"""
+        return self.board_key ^ clock_key(self.white_time, self.black_time)
+
+    def snapshot(self) -> bytes:
+        """Компактный снимок игры: заголовок с часами, очередью хода и контролем времени + снимок доски"""
+        header = self.SNAPSHOT_HEADER.pack(
+            self.white_time,
+            self.black_time,
+            self.side_to_move == FigureColor.BLACK,
+            self.time_control.increment,
+            self.time_control.delay,
+        )
+        return header + self.board.snapshot()
+
+    def load_snapshot(self, snapshot: bytes) -> None:
+        """Заменяет состояние игры снапшотом, переиспользуя доску и буферы"""
+        white_time, black_time, black_to_move, increment, delay = self.SNAPSHOT_HEADER.unpack_from(snapshot)
+        self.board.load_snapshot(snapshot[self.SNAPSHOT_HEADER.size:])
+        self.time_control = TimeControl(increment, delay)
+        self.white_time = white_time
+        self.black_time = black_time
+        self.side_to_move = FigureColor.BLACK if black_to_move else FigureColor.WHITE
+        self.undo_stack.clear()
+        self.time_log.clear()
+        self.flagged = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot: bytes) -> "ChessGame":
+        white_time, black_time, black_to_move, increment, delay = cls.SNAPSHOT_HEADER.unpack_from(snapshot)
+        game = cls(
+            board=ChessBoard.from_snapshot(snapshot[cls.SNAPSHOT_HEADER.size:]),
+            time_units=white_time,
+            time_control=TimeControl(increment, delay),
+        )
+        game.black_time = black_time
+        game.side_to_move = FigureColor.BLACK if black_to_move else FigureColor.WHITE
+        return game
@@ -4,3 +4,7 @@ import enum
 class FigureColor(enum.Enum):
     WHITE = "white"
     BLACK = "black"
+
+    @property
+    def opposite(self) -> "FigureColor":
+        return FigureColor.BLACK if self is FigureColor.WHITE else FigureColor.WHITE
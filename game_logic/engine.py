@@ -0,0 +1,308 @@
+"""Поиск хода: итеративное углубление + альфа-бета с таблицей транспозиций"""
+import time
+from typing import Callable, NamedTuple
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import BoardFigure
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.eval_cache import EvaluationCache, CachedAnalysis, cache_key
+from game_logic.exceptions import IllegalMoveException
+from game_logic.figure_abilities import MoveAbility
+from game_logic.registry import ABILITIES
+from game_logic.figures import (
+    Figure,
+    RookFigure,
+    BishopFigure,
+    KnightFigure,
+    QueenFigure,
+    KingFigure,
+    PawnFigure,
+)
+
+FIGURE_VALUES: dict[type[Figure], int] = {
+    PawnFigure: 100,
+    KnightFigure: 320,
+    BishopFigure: 330,
+    RookFigure: 500,
+    QueenFigure: 900,
+    KingFigure: 20000,
+}
+DEFAULT_FIGURE_VALUE = 300
+MATE_SCORE = 1_000_000
+# оценки ближе к MATE_SCORE - мат через (MATE_SCORE - |оценка|) полуходов
+MATE_BOUND = MATE_SCORE - 1000
+DEFAULT_MOVE_COST = 1
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class SearchMove(NamedTuple):
+    """Ход вместе с его стоимостью во времени (см. ChessGame.perform_move)"""
+    figure: BoardFigure
+    ability: type[MoveAbility]
+    to_position: BoardPosition
+    time_units: int
+
+
+class SearchResult(NamedTuple):
+    best_move: SearchMove | None
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class TranspositionTable:
+    """Таблица транспозиций фиксированного размера
+
+    Слот выбирается по ключу позиции. Запись заменяется, если она из прошлого поиска
+    или новая запись посчитана на не меньшую глубину.
+    """
+    def __init__(self, size: int = 1 << 16):
+        self.size = size
+        self.entries: list[tuple | None] = [None] * size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def probe(self, key: int) -> tuple | None:
+        """Запись (key, depth, score, flag, move, generation) или None"""
+        self.probes += 1
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: tuple | None) -> None:
+        slot = key % self.size
+        entry = self.entries[slot]
+        if entry is None or entry[5] != self.generation or depth >= entry[1]:
+            self.entries[slot] = (key, depth, score, flag, move, self.generation)
+
+    def clear(self) -> None:
+        self.entries = [None] * self.size
+
+
+def _score_to_tt(score: int, ply: int) -> int:
+    """В таблице матовые оценки хранятся от текущей позиции, а не от корня"""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class _SearchAborted(Exception):
+    """Исчерпан бюджет узлов или времени"""
+
+
+class Engine:
+    """Движок поиска лучшего хода для ChessGame
+
+    time_cost задаёт стоимость хода в единицах времени, она списывается с часов
+    при каждом ходе в дереве поиска: сторона, у которой кончилось время, проигрывает.
+    Если передан cache, результаты search сохраняются в нём и переиспользуются,
+    когда сохранённая глубина не меньше запрошенной.
+    """
+    def __init__(
+        self,
+        tt_size: int = 1 << 16,
+        time_cost: Callable[[BoardFigure, type[MoveAbility], BoardPosition], int] | None = None,
+        cache: EvaluationCache | None = None,
+    ):
+        self.tt = TranspositionTable(tt_size)
+        self.time_cost = time_cost
+        self.cache = cache
+        self.nodes = 0
+        self._max_nodes: int | None = None
+        self._deadline: float | None = None
+
+    def evaluate(self, game: ChessGame) -> int:
+        """Оценка позиции с точки зрения стороны, которая ходит"""
+        board = game.board
+        white_mask = board.color_masks[FigureColor.WHITE]
+        black_mask = board.color_masks[FigureColor.BLACK]
+        score = 0
+        for figure_type, mask in board.figure_masks.items():
+            if mask:
+                value = FIGURE_VALUES.get(figure_type, DEFAULT_FIGURE_VALUE)
+                score += value * ((mask & white_mask).bit_count() - (mask & black_mask).bit_count())
+        return score if game.side_to_move == FigureColor.WHITE else -score
+
+    def search(
+        self,
+        game: ChessGame,
+        max_depth: int = 64,
+        max_nodes: int | None = None,
+        max_time: float | None = None,
+    ) -> SearchResult:
+        """Итеративное углубление до max_depth или до исчерпания бюджета узлов/времени"""
+        started = time.perf_counter()
+        self.nodes = 0
+        self._max_nodes = max_nodes
+        self._deadline = started + max_time if max_time is not None else None
+        if self.cache is not None:
+            cached = self.cache.get(cache_key(game))
+            if cached is not None and cached.depth >= max_depth:
+                return SearchResult(
+                    self._cached_move(game, cached), cached.score, cached.depth, 0, time.perf_counter() - started
+                )
+        self.tt.new_search()
+
+        result = SearchResult(None, 0, 0, 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, best_move = self._search_root(game, depth)
+            except _SearchAborted:
+                break
+            result = SearchResult(best_move, score, depth, self.nodes, time.perf_counter() - started)
+            if best_move is None or abs(score) >= MATE_SCORE - max_depth:
+                break
+        if self.cache is not None and result.depth:
+            move = result.best_move
+            if move is None:
+                cached = CachedAnalysis(result.score, result.depth)
+            else:
+                cached = CachedAnalysis(
+                    result.score,
+                    result.depth,
+                    move.figure.square,
+                    move.to_position.index,
+                    move.ability.type_id,
+                )
+            self.cache.put(cache_key(game), cached)
+        return result._replace(nodes=self.nodes, elapsed=time.perf_counter() - started)
+
+    def _cached_move(self, game: ChessGame, cached: CachedAnalysis) -> SearchMove | None:
+        if cached.ability_id < 0:
+            return None
+        figure = game.board.get_figure_by_square(cached.from_square)
+        ability_class = ABILITIES.get(cached.ability_id)
+        to_position = BoardPosition.from_index(cached.to_square)
+        time_units = self.time_cost(figure, ability_class, to_position) if self.time_cost else DEFAULT_MOVE_COST
+        return SearchMove(figure, ability_class, to_position, time_units)
+
+    def _search_root(self, game: ChessGame, depth: int) -> tuple[int, SearchMove | None]:
+        alpha, beta = -MATE_SCORE - 1, MATE_SCORE + 1
+        best_move = None
+        best_score = -MATE_SCORE - 1
+        for move in self._ordered_moves(game, self.tt.probe(game.position_key)):
+            score = self._search_move(game, move, depth, alpha, beta, 0)
+            if score is None:
+                continue
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        if best_move is None:
+            return (-MATE_SCORE if game.board.is_in_check(game.side_to_move) else 0), None
+        self.tt.store(game.position_key, depth, best_score, EXACT, self._move_key(best_move))
+        return best_score, best_move
+
+    def _search_move(
+        self, game: ChessGame, move: SearchMove, depth: int, alpha: int, beta: int, ply: int
+    ) -> int | None:
+        """Оценка хода для стороны, которая его делает; None - ход невозможен"""
+        try:
+            record = game.make_move(move.figure, move.ability(), move.to_position, move.time_units)
+        except IllegalMoveException:
+            return None
+        try:
+            own_time = game.white_time if move.figure.color == FigureColor.WHITE else game.black_time
+            if own_time < 0:
+                return -MATE_SCORE + ply + 1
+            return -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            game.unmake_move(record)
+
+    def _negamax(self, game: ChessGame, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self._max_nodes is not None and self.nodes > self._max_nodes:
+            raise _SearchAborted
+        if self._deadline is not None and not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _SearchAborted
+
+        if not game.board.get_figures_mask(KingFigure, game.side_to_move) \
+                and game.board.get_figures_mask(KingFigure, game.side_to_move.opposite):
+            return -MATE_SCORE + ply
+        if depth <= 0:
+            return self.evaluate(game)
+
+        key = game.position_key
+        entry = self.tt.probe(key)
+        if entry is not None and entry[1] >= depth:
+            score, flag = _score_from_tt(entry[2], ply), entry[3]
+            if flag == EXACT:
+                return score
+            if flag == LOWER_BOUND and score >= beta:
+                return score
+            if flag == UPPER_BOUND and score <= alpha:
+                return score
+
+        original_alpha = alpha
+        best_score = -MATE_SCORE - 1
+        best_move = None
+        for move in self._ordered_moves(game, entry):
+            score = self._search_move(game, move, depth, alpha, beta, ply)
+            if score is None:
+                continue
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_move is None:
+            return -MATE_SCORE + ply if game.board.is_in_check(game.side_to_move) else 0
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, _score_to_tt(best_score, ply), flag, self._move_key(best_move))
+        return best_score
+
+    def _ordered_moves(self, game: ChessGame, entry: tuple | None) -> list[SearchMove]:
+        """Ход из таблицы транспозиций, затем взятия (MVV-LVA), затем тихие ходы"""
+        board = game.board
+        tt_move = entry[4] if entry is not None else None
+        scored_moves = []
+        for figure, ability_class, to_position in board.all_legal_moves(game.side_to_move):
+            time_units = self.time_cost(figure, ability_class, to_position) if self.time_cost else DEFAULT_MOVE_COST
+            move = SearchMove(figure, ability_class, to_position, time_units)
+            if tt_move is not None and self._move_key(move) == tt_move:
+                order = 1 << 30
+            else:
+                victim = board.get_figure_by_square(to_position.index)
+                if victim is None:
+                    order = 0
+                else:
+                    order = (
+                        FIGURE_VALUES.get(type(victim.figure), DEFAULT_FIGURE_VALUE) * 16
+                        - FIGURE_VALUES.get(type(figure.figure), DEFAULT_FIGURE_VALUE) // 16
+                    )
+            scored_moves.append((order, move))
+        scored_moves.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored_moves]
+
+    @staticmethod
+    def _move_key(move: SearchMove) -> tuple:
+        return move.figure.square, move.to_position.index, move.ability
@@ -0,0 +1,135 @@
+"""Кэш результатов анализа позиций с LRU-вытеснением
+
+Ключ - (ChessGame.board_key, время белых, время черных, добавка, задержка). Один кэш можно делить между
+всеми играми процесса (см. shared_cache); при указании path записи дублируются в sqlite
+и переживают перезапуск. На диск записи уходят пачками по flush_every штук одной транзакцией
+(и при flush/close), а не по одной на put.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from game_logic.chess_game import ChessGame
+
+CacheKey = tuple[int, int, int, int, int]
+
+
+class CachedAnalysis(NamedTuple):
+    """Результат анализа; ход задан номерами клеток и type_id абилки (-1 - хода нет)"""
+    score: int
+    depth: int
+    from_square: int = -1
+    to_square: int = -1
+    ability_id: int = -1
+
+
+def cache_key(game: ChessGame) -> CacheKey:
+    return game.board_key, game.white_time, game.black_time, game.time_control.increment, game.time_control.delay
+
+
+def _to_signed(value: int) -> int:
+    # sqlite хранит только знаковые 64-битные числа
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class EvaluationCache:
+    def __init__(self, max_entries: int = 100_000, path: str | None = None, flush_every: int = 64):
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, CachedAnalysis] = OrderedDict()
+        # записи, ещё не сброшенные на диск
+        self._pending: dict[CacheKey, CachedAnalysis] = {}
+        self._lock = threading.Lock()
+        # диск под отдельным локом, чтобы чтение из памяти не ждало sqlite
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # таблица analysis_v2: в ключ добавлен контроль времени, старая таблица analysis не читается
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_v2 ("
+                "position INTEGER, white_time INTEGER, black_time INTEGER, increment INTEGER, delay INTEGER, "
+                "score INTEGER, depth INTEGER, from_square INTEGER, to_square INTEGER, ability_id INTEGER, "
+                "PRIMARY KEY (position, white_time, black_time, increment, delay))"
+            )
+            self._db.commit()
+
+    def get(self, key: CacheKey) -> CachedAnalysis | None:
+        with self._lock:
+            value = self._entries.get(key) or self._pending.get(key)
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        row = None
+        if self._db is not None:
+            with self._db_lock:
+                if self._db is not None:
+                    row = self._db.execute(
+                        "SELECT score, depth, from_square, to_square, ability_id FROM analysis_v2 "
+                        "WHERE position = ? AND white_time = ? AND black_time = ? AND increment = ? AND delay = ?",
+                        (_to_signed(key[0]), *key[1:]),
+                    ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            value = CachedAnalysis(*row)
+            self._remember(key, value)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: CachedAnalysis) -> None:
+        with self._lock:
+            self._remember(key, value)
+            if self._db is None:
+                return
+            self._pending[key] = value
+            if len(self._pending) < self.flush_every:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Пишет накопленные записи на диск одной транзакцией"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.executemany(
+                "INSERT OR REPLACE INTO analysis_v2 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(_to_signed(key[0]), *key[1:], *value) for key, value in pending.items()],
+            )
+            self._db.commit()
+
+    def _remember(self, key: CacheKey, value: CachedAnalysis) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> tuple[int, int]:
+        """(попадания, всего обращений) - формат instrumentation.Metrics.register_cache"""
+        return self.hits, self.hits + self.misses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+shared_cache = EvaluationCache()
@@ -12,3 +12,15 @@ class SamePositionException(Exception):
 
 class WrongAbilityException(Exception):
     """У фигуры нет такой абилки"""
+
+
+class GameNotFoundException(Exception):
+    """Игра не найдена"""
+
+
+class WrongTurnException(IllegalMoveException):
+    """Сейчас ход другой стороны"""
+
+
+class TimeOverException(IllegalMoveException):
+    """У стороны закончилось время"""
@@ -3,6 +3,26 @@ from abc import ABC, abstractmethod
 
 from game_logic.exceptions import IllegalMoveException, WrongAbilityException
 from game_logic.board_position import BoardPosition
+from game_logic.registry import ABILITIES, Singleton
+from game_logic.constants import FigureColor
+from game_logic.bitboard import (
+    BOARD_SIZE,
+    FULL_MASK,
+    BETWEEN,
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    WHITE_PAWN_ATTACKS,
+    BLACK_PAWN_ATTACKS,
+    WHITE_PAWN_PUSHES,
+    BLACK_PAWN_PUSHES,
+    WHITE_PAWN_DOUBLE_PUSHES,
+    BLACK_PAWN_DOUBLE_PUSHES,
+    iter_squares,
+    ROOK_DIRECTIONS,
+    BISHOP_DIRECTIONS,
+    QUEEN_DIRECTIONS,
+    sliding_attacks,
+)
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -10,109 +30,164 @@ if TYPE_CHECKING:
     from game_logic.board_position import BoardPosition
 
 
-class Ability(ABC):
+class Ability(Singleton, ABC):
+    """Абилка фигуры"""
+    type_id = None
+    ability_bit = 0
+
+    @classmethod
+    def register(cls) -> int:
+        """Регистрирует абилку в ABILITIES, возвращает её бит в масках абилок фигур"""
+        cls.ability_bit = 1 << ABILITIES.register(cls)
+        return cls.ability_bit
+
     @abstractmethod
     def perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition | None = None) -> None:
         """Применяет абилку к доске"""
         pass
 
     def check_ability(self, figure: BoardFigure):
-        if self.__class__ not in figure.figure.abilities:
+        if not figure.figure.abilities_mask & self.ability_bit:
             raise WrongAbilityException
 
 
 class MoveAbility(Ability):
+    # reach[square] - клетки, куда абилка в принципе может увести фигуру с square на пустой доске;
+    # по умолчанию любые, подклассы сужают таблицу, чтобы отсекать невозможные ходы до обращения к доске
+    reach: tuple[int, ...] = (FULL_MASK,) * BOARD_SIZE
+
     @abstractmethod
     def is_can_perform(self, board: ChessBoard, from_pos: BoardPosition, to_pos: BoardPosition) -> bool:
         """Проверка возможности передвинуть фигуру или побить другую"""
 
+    def get_reach_mask(self, figure: BoardFigure) -> int:
+        return self.reach[figure.square]
+
+    def get_moves_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        """Маска клеток, куда фигура может пойти. По умолчанию проверяет через is_can_perform каждую клетку reach"""
+        mask = 0
+        for square in iter_squares(self.get_reach_mask(figure) & ~(1 << figure.square)):
+            if self.is_can_perform(board, figure, BoardPosition.from_index(square)):
+                mask |= 1 << square
+        return mask
+
+    def get_attacks_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        """Маска клеток, которые фигура бьёт. По умолчанию совпадает с маской ходов"""
+        return self.get_moves_mask(board, figure)
+
     def perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition | None = None) -> None:
-        """Передвигает фигуру"""
+        """Передвигает фигуру; ход, после которого свой король под шахом, откатывается"""
         self.check_ability(figure)
-        if self.is_can_perform(board, figure, to_pos):
-            to_figure = board.get_figure_by_position(to_pos)
-            figure.position = to_pos
-            if to_figure is not None:
-                to_figure.is_dead = True
-        else:
+        if not self.get_reach_mask(figure) >> to_pos.index & 1 or not self.is_can_perform(board, figure, to_pos):
+            raise IllegalMoveException
+        from_pos = figure.position
+        captured = board.move_figure(figure, to_pos)
+        if board.is_in_check(figure.color):
+            board.unmove_figure(figure, from_pos, captured)
             raise IllegalMoveException
 
 
-class RookMoveAbility(MoveAbility):
-    def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        to_figure = board.get_figure_by_position(to_pos)
-        if to_figure is not None:
-            if to_figure.color == figure.color:
-                return False
+class MaskMoveAbility(MoveAbility):
+    """Абилка, ходы которой задаются битовой маской атакуемых клеток"""
+    @abstractmethod
+    def get_attacks_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        """Маска атакуемых клеток с учетом блокирующих фигур"""
 
-        if to_pos.x != figure.position.x and to_pos.y != figure.position.y:
-            return False
+    def get_moves_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        return self.get_attacks_mask(board, figure) & ~board.color_masks[figure.color]
 
-        if to_pos.x == figure.position.x:
-            if to_pos.y < figure.position.y:
-                bad_y_range = range(to_pos.y + 1, figure.position.y)
-            else:
-                bad_y_range = range(figure.position.y + 1, to_pos.y)
-            for curr_figure in board.figures:
-                if curr_figure.position.x == figure.position.x and curr_figure.position.y in bad_y_range:
-                    return False
-
-        if to_pos.y == figure.position.y:
-            if to_pos.x < figure.position.x:
-                bad_x_range = range(to_pos.x + 1, figure.position.x)
-            else:
-                bad_x_range = range(figure.position.x + 1, to_pos.x)
-            for curr_figure in board.figures:
-                if curr_figure.position.y == figure.position.y and curr_figure.position.x in bad_x_range:
-                    return False
-        return True
-
-
-class BishopMoveAbility(MoveAbility):
     def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        to_figure = board.get_figure_by_position(to_pos)
-        if to_figure is not None:
-            if to_figure.color == figure.color:
-                return False
-
-        if abs(to_pos.x - figure.position.x) != abs(to_pos.y - figure.position.y):
+        if not self.get_reach_mask(figure) >> to_pos.index & 1:
             return False
+        return bool(self.get_moves_mask(board, figure) >> to_pos.index & 1)
 
-        move_range = range(1, abs(to_pos.x - figure.position.x)+1)
-        bad_positions = [BoardPosition(x=figure.position.x+i, y=figure.position.y+i) for i in move_range]
-        for curr_figure in board.figures:
-            if curr_figure.position in bad_positions:
-                return False
 
-        return True
+class LeaperMoveAbility(MaskMoveAbility):
+    """Прыгающая фигура: атаки берутся из заранее посчитанной таблицы (см. bitboard.build_leaper_table)"""
+    attacks_table: tuple[int, ...] = (0,) * BOARD_SIZE
+    reach = attacks_table
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "attacks_table" in cls.__dict__:
+            cls.reach = cls.attacks_table
 
-class KnightMoveAbility(MoveAbility):
-    def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        to_figure = board.get_figure_by_position(to_pos)
-        if to_figure is not None:
-            if to_figure.color == figure.color:
-                return False
+    def get_attacks_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        return self.attacks_table[figure.square]
 
-        x_diff = abs(to_pos.x - figure.position.x)
-        y_diff = abs(to_pos.y - figure.position.y)
 
-        if not ((x_diff == 1 and y_diff == 2) or (x_diff == 2 and y_diff == 1)):
-            return False
+class SlidingMoveAbility(MaskMoveAbility):
+    """Дальнобойная фигура: ходит по лучам directions (см. bitboard.DIRECTIONS) до первой занятой клетки"""
+    directions: tuple[int, ...] = ()
+    reach = (0,) * BOARD_SIZE
 
-        return True
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "directions" in cls.__dict__:
+            cls.reach = tuple(sliding_attacks(square, 0, cls.directions) for square in range(BOARD_SIZE))
 
+    def get_attacks_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        return sliding_attacks(figure.square, board.occupied, self.directions)
 
-class QueenMoveAbility(MoveAbility):
     def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        return True
+        from_square = figure.square
+        to_square = to_pos.index
+        if not self.reach[from_square] >> to_square & 1:
+            return False
+        if BETWEEN[from_square][to_square] & board.occupied:
+            return False
+        to_figure = board.get_figure_by_square(to_square)
+        return to_figure is None or to_figure.color != figure.color
 
 
-class KingMoveAbility(MoveAbility):
-    def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        return True
+class RookMoveAbility(SlidingMoveAbility):
+    directions = ROOK_DIRECTIONS
 
 
-class PawnMoveAbility(MoveAbility):
-    def is_can_perform(self, board: ChessBoard, figure: BoardFigure, to_pos: BoardPosition) -> bool:
-        return True
+class BishopMoveAbility(SlidingMoveAbility):
+    directions = BISHOP_DIRECTIONS
+
+
+class KnightMoveAbility(LeaperMoveAbility):
+    attacks_table = KNIGHT_ATTACKS
+
+
+class QueenMoveAbility(SlidingMoveAbility):
+    directions = QUEEN_DIRECTIONS
+
+
+class KingMoveAbility(LeaperMoveAbility):
+    attacks_table = KING_ATTACKS
+
+
+def _pawn_reach(pushes: tuple[int, ...], double_pushes: tuple[int, ...], attacks: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(push | double | attack for push, double, attack in zip(pushes, double_pushes, attacks))
+
+
+class PawnMoveAbility(MaskMoveAbility):
+    """Пешка: шаг вперёд на свободную клетку, двойной шаг с начальной горизонтали, взятие по диагонали
+
+    Превращение на последней горизонтали делает доска (см. ChessBoard.move_figure).
+    """
+    attacks_tables = {FigureColor.WHITE: WHITE_PAWN_ATTACKS, FigureColor.BLACK: BLACK_PAWN_ATTACKS}
+    pushes = {FigureColor.WHITE: WHITE_PAWN_PUSHES, FigureColor.BLACK: BLACK_PAWN_PUSHES}
+    double_pushes = {FigureColor.WHITE: WHITE_PAWN_DOUBLE_PUSHES, FigureColor.BLACK: BLACK_PAWN_DOUBLE_PUSHES}
+    reaches = {
+        FigureColor.WHITE: _pawn_reach(WHITE_PAWN_PUSHES, WHITE_PAWN_DOUBLE_PUSHES, WHITE_PAWN_ATTACKS),
+        FigureColor.BLACK: _pawn_reach(BLACK_PAWN_PUSHES, BLACK_PAWN_DOUBLE_PUSHES, BLACK_PAWN_ATTACKS),
+    }
+
+    def get_reach_mask(self, figure: BoardFigure) -> int:
+        return self.reaches[figure.color][figure.square]
+
+    def get_attacks_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        return self.attacks_tables[figure.color][figure.square]
+
+    def get_moves_mask(self, board: ChessBoard, figure: BoardFigure) -> int:
+        square = figure.square
+        empty = ~board.occupied
+        moves = self.pushes[figure.color][square] & empty
+        if moves:
+            moves |= self.double_pushes[figure.color][square] & empty
+        return moves | self.attacks_tables[figure.color][square] & board.color_masks[figure.color.opposite]
+
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+
+from game_logic.registry import FIGURES, Singleton
 from game_logic.figure_abilities import (
     Ability,
     RookMoveAbility,
@@ -10,42 +12,64 @@ from game_logic.figure_abilities import (
 )
 
 
-class Figure(ABC):
-    """Абстрактный класс фигуры"""
+class Figure(Singleton, ABC):
+    """Абстрактный класс фигуры
+
+    Подклассы регистрируются автоматически: получают type_id и abilities_mask -
+    битовую маску разрешённых абилок (по их type_id). symbol - буква фигуры в FEN
+    (заглавная, у чёрных записывается строчной).
+    """
     abilities = []
+    type_id = None
+    symbol = None
+    abilities_mask = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        FIGURES.register(cls)
+        cls.abilities_mask = 0
+        for ability_class in cls.abilities:
+            cls.abilities_mask |= ability_class.register()
 
 
 class RookFigure(Figure):
+    symbol = "R"
     abilities = [
         RookMoveAbility
     ]
 
 
 class BishopFigure(Figure):
+    symbol = "B"
     abilities = [
         BishopMoveAbility
     ]
 
 
 class KnightFigure(Figure):
+    symbol = "N"
     abilities = [
         KnightMoveAbility
     ]
 
 
 class QueenFigure(Figure):
+    symbol = "Q"
     abilities = [
         QueenMoveAbility
     ]
 
 
 class KingFigure(Figure):
+    symbol = "K"
     abilities = [
         KingMoveAbility
     ]
 
 
 class PawnFigure(Figure):
+    symbol = "P"
     abilities = [
         PawnMoveAbility
     ]
+
@@ -0,0 +1,174 @@
+"""Компактный бинарный формат записи партий
+
+Файл - последовательность партий. Партия:
+    заголовок GAME_HEADER: магия b"OMGR", версия, число ходов;
+    снапшот начальной позиции ChessGame (часы, очередь хода, доска);
+    по 4 байта (little-endian uint32) на ход: биты 0-5 - клетка откуда, 6-11 - клетка куда,
+    12-15 - type_id абилки (см. registry.ABILITIES), 16-31 - потраченное время.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+from game_logic.chess_game import ChessGame
+from game_logic.figure_abilities import Ability
+from game_logic.registry import ABILITIES
+
+MAGIC = b"OMGR"
+# версия 2: в снапшоте начальной позиции есть контроль времени
+VERSION = 2
+GAME_HEADER = struct.Struct("<4sBI")
+SNAPSHOT_SIZE = ChessGame.SNAPSHOT_HEADER.size + 64
+MOVE_SIZE = 4
+MAX_MOVE_TIME = 0xFFFF
+
+
+class RecordedMove(NamedTuple):
+    from_square: int
+    to_square: int
+    ability: type[Ability]
+    time_units: int
+
+
+class GameRecord(NamedTuple):
+    """Партия: снапшот начальной позиции ChessGame и закодированные ходы"""
+    snapshot: bytes
+    moves: array
+
+    def iter_moves(self) -> Iterator[RecordedMove]:
+        for value in self.moves:
+            yield decode_move(value)
+
+
+class BadRecordException(Exception):
+    """Повреждённая или чужая запись партии"""
+
+
+def encode_move(from_square: int, to_square: int, ability: type[Ability], time_units: int) -> int:
+    if not 0 <= time_units <= MAX_MOVE_TIME:
+        raise ValueError(f"time_units must be in 0..{MAX_MOVE_TIME}")
+    return from_square | to_square << 6 | ability.type_id << 12 | time_units << 16
+
+
+def decode_move(value: int) -> RecordedMove:
+    return RecordedMove(value & 0x3F, value >> 6 & 0x3F, ABILITIES.get(value >> 12 & 0xF), value >> 16)
+
+
+def moves_from_game(game: ChessGame) -> Iterator[RecordedMove]:
+    """Ходы, сделанные в игре (по её стеку отмены)"""
+    for record in game.undo_stack:
+        yield RecordedMove(record.from_position.index, record.to_position.index, record.ability, record.time_units)
+
+
+def _moves_from_bytes(data) -> array:
+    moves = array("I")
+    moves.frombytes(data)
+    if sys.byteorder == "big":
+        moves.byteswap()
+    return moves
+
+
+def _parse_header(data, offset: int) -> int:
+    """Возвращает число ходов партии, заголовок которой начинается с offset"""
+    magic, version, move_count = GAME_HEADER.unpack_from(data, offset)
+    if magic != MAGIC or version != VERSION:
+        raise BadRecordException
+    return move_count
+
+
+class GameRecordWriter:
+    """Потоково пишет партии в бинарный файл"""
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def write_game(self, snapshot: bytes, moves: Iterable[RecordedMove]) -> int:
+        """Записывает партию, возвращает её смещение в файле"""
+        if len(snapshot) != SNAPSHOT_SIZE:
+            raise ValueError("snapshot must be a ChessGame snapshot")
+        encoded = array("I", (encode_move(*move) for move in moves))
+        if sys.byteorder == "big":
+            encoded.byteswap()
+        offset = self.file.tell()
+        self.file.write(GAME_HEADER.pack(MAGIC, VERSION, len(encoded)))
+        self.file.write(snapshot)
+        self.file.write(encoded.tobytes())
+        return offset
+
+    def write_chess_game(self, initial_snapshot: bytes, game: ChessGame) -> int:
+        return self.write_game(initial_snapshot, moves_from_game(game))
+
+
+def read_games(file: BinaryIO) -> Iterator[tuple[int, GameRecord]]:
+    """Потоково читает партии, отдаёт пары (смещение, партия)"""
+    offset = file.tell()
+    while True:
+        header = file.read(GAME_HEADER.size)
+        if not header:
+            return
+        if len(header) != GAME_HEADER.size:
+            raise BadRecordException
+        move_count = _parse_header(header, 0)
+        snapshot = file.read(SNAPSHOT_SIZE)
+        moves_data = file.read(move_count * MOVE_SIZE)
+        if len(snapshot) != SNAPSHOT_SIZE or len(moves_data) != move_count * MOVE_SIZE:
+            raise BadRecordException
+        yield offset, GameRecord(snapshot, _moves_from_bytes(moves_data))
+        offset += GAME_HEADER.size + SNAPSHOT_SIZE + move_count * MOVE_SIZE
+
+
+class GameRecordFile:
+    """Доступ к файлу партий по смещению через mmap"""
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # пустой файл нельзя отобразить в память
+            self._mmap = b""
+
+    def game_at(self, offset: int) -> GameRecord:
+        if offset + GAME_HEADER.size > len(self._mmap):
+            raise BadRecordException
+        move_count = _parse_header(self._mmap, offset)
+        start = offset + GAME_HEADER.size
+        moves_start = start + SNAPSHOT_SIZE
+        moves_end = moves_start + move_count * MOVE_SIZE
+        if moves_end > len(self._mmap):
+            raise BadRecordException
+        return GameRecord(bytes(self._mmap[start:moves_start]), _moves_from_bytes(self._mmap[moves_start:moves_end]))
+
+    @property
+    def size(self) -> int:
+        """Сколько байт файла отображено в память"""
+        return len(self._mmap)
+
+    def offsets(self) -> Iterator[int]:
+        """Смещения всех партий; ходы при этом не читаются
+
+        Повреждённая запись тоже отдаётся (game_at на ней бросит BadRecordException),
+        но после неё перебор останавливается: границу следующей партии уже не найти.
+        """
+        offset = 0
+        size = len(self._mmap)
+        while offset < size:
+            yield offset
+            if offset + GAME_HEADER.size > size:
+                return
+            try:
+                move_count = _parse_header(self._mmap, offset)
+            except BadRecordException:
+                return
+            offset += GAME_HEADER.size + SNAPSHOT_SIZE + move_count * MOVE_SIZE
+
+    def close(self) -> None:
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordFile":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
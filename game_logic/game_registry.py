@@ -0,0 +1,238 @@
+"""Реестр живых игр для асинхронного сервиса"""
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+
+from game_logic.board_position import BoardPosition
+from game_logic.broadcast import BroadcastHub, encode_flag, encode_move
+from game_logic.chess_board import ChessBoard
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.exceptions import GameNotFoundException, IllegalMoveException, WrongAbilityException
+from game_logic.eval_cache import EvaluationCache, CachedAnalysis, cache_key
+from game_logic.parallel import analyse_snapshot, AnalysisResult
+from game_logic.registry import ABILITIES
+from game_logic.time_control import FlagScheduler, TimeControl
+
+
+class GameSession:
+    """Живая игра: ходы по одной игре идут строго по очереди под её собственным локом"""
+    def __init__(self, game_id: str, game: ChessGame):
+        self.game_id = game_id
+        self.game = game
+        self.lock = asyncio.Lock()
+        self.version = 0
+        self._changed = asyncio.Event()
+        self.last_active = time.monotonic()
+        # игра удалена из реестра; ждущие изменений должны отключиться
+        self.closed = False
+
+    @property
+    def finished(self) -> bool:
+        return self.game.flagged is not None
+
+    def notify_changed(self) -> None:
+        self.version += 1
+        self.last_active = time.monotonic()
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_changed(self, version: int) -> int:
+        """Ждёт изменения игры после версии version, возвращает новую версию"""
+        while self.version == version:
+            await self._changed.wait()
+        return self.version
+
+
+class GameRegistry:
+    """Шардированный реестр игр
+
+    Игры распределены по шардам по game_id, у каждого шарда свой лок, поэтому
+    создание и поиск игр не упираются в один общий лок. Результаты analyse
+    сохраняются в cache, общем для всех игр реестра. Если задан flags, после каждого
+    хода взводится таймер падения флага стороны, которая должна ходить. Если задан
+    broadcast, ходы и падения флага рассылаются зрителям дельтами.
+    """
+    def __init__(
+        self,
+        shards: int = 64,
+        cache: EvaluationCache | None = None,
+        flags: FlagScheduler | None = None,
+        broadcast: BroadcastHub | None = None,
+    ):
+        self.cache = cache
+        self.flags = flags
+        self.broadcast = broadcast
+        self._flag_tasks: set[asyncio.Task] = set()
+        self._shards: list[dict[str, GameSession]] = [{} for _ in range(shards)]
+        self._shard_locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard_index(self, game_id: str) -> int:
+        return hash(game_id) % len(self._shards)
+
+    def create(self, board: ChessBoard, time_units: int, time_control: TimeControl | None = None) -> GameSession:
+        game_id = uuid.uuid4().hex
+        session = GameSession(game_id, ChessGame(board=board, time_units=time_units, time_control=time_control))
+        index = self._shard_index(game_id)
+        with self._shard_locks[index]:
+            self._shards[index][game_id] = session
+        self._watch_flag(session)
+        return session
+
+    def _watch_flag(self, session: GameSession) -> None:
+        if self.flags is None:
+            return
+        game = session.game
+        if game.flagged is not None:
+            self.flags.cancel(session.game_id)
+            return
+        color = game.side_to_move
+        time_left = game.white_time if color == FigureColor.WHITE else game.black_time
+
+        version = session.version
+
+        def on_flag():
+            # колесо таймеров не ждёт: падение флага применяется отдельной задачей под локом игры
+            task = asyncio.get_running_loop().create_task(self._flag_fall(session, version))
+            self._flag_tasks.add(task)
+            task.add_done_callback(self._flag_tasks.discard)
+
+        self.flags.watch(session.game_id, time_left + game.time_control.delay, on_flag)
+
+    async def _flag_fall(self, session: GameSession, version: int) -> None:
+        async with session.lock:
+            game = session.game
+            # после постановки таймера был ход (или игру уже закрыли) - таймер устарел
+            if session.version != version or game.flagged is not None:
+                return
+            if self._shards[self._shard_index(session.game_id)].get(session.game_id) is not session:
+                return
+            game.flag_fall(game.side_to_move)
+            session.notify_changed()
+            channel = self._get_channel(session.game_id)
+            if channel is not None:
+                channel.publish(encode_flag(session.version, game))
+
+    def _get_channel(self, game_id: str):
+        return self.broadcast.get(game_id) if self.broadcast is not None else None
+
+    def get(self, game_id: str) -> GameSession:
+        session = self._shards[self._shard_index(game_id)].get(game_id)
+        if session is None:
+            raise GameNotFoundException
+        return session
+
+    def remove(self, game_id: str) -> None:
+        index = self._shard_index(game_id)
+        with self._shard_locks[index]:
+            session = self._shards[index].pop(game_id, None)
+        if session is None:
+            raise GameNotFoundException
+        session.closed = True
+        session.notify_changed()
+        if self.flags is not None:
+            self.flags.cancel(game_id)
+        if self.broadcast is not None:
+            self.broadcast.close(game_id)
+
+    def evict(self, max_idle: float, finished_ttl: float, now: float | None = None) -> int:
+        """Удаляет игры без изменений дольше max_idle и законченные дольше finished_ttl назад
+
+        Вместе с игрой снимаются её таймер флага и канал зрителей. Возвращает число удалённых игр.
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        for index, shard in enumerate(self._shards):
+            with self._shard_locks[index]:
+                for game_id, session in shard.items():
+                    idle = now - session.last_active
+                    if idle > max_idle or (session.finished and idle > finished_ttl):
+                        expired.append(game_id)
+        removed = 0
+        for game_id in expired:
+            try:
+                self.remove(game_id)
+            except GameNotFoundException:
+                continue
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    async def perform_move(
+        self,
+        game_id: str,
+        from_position: BoardPosition,
+        ability_name: str,
+        to_position: BoardPosition,
+        time_units: int,
+    ) -> GameSession:
+        """Проверяет и делает ход под локом игры
+
+        Проверка хода - чистый Python (десятки микросекунд) и держит GIL, поэтому выносить её
+        в поток бессмысленно; зато прямо в event loop никто не увидит доску посреди проверки
+        (perform временно делает ход, чтобы проверить шах).
+        """
+        session = self.get(game_id)
+        async with session.lock:
+            game = session.game
+            figure = game.board.get_figure_by_position(from_position)
+            if figure is None:
+                raise IllegalMoveException
+            try:
+                ability_class = ABILITIES.get_by_name(ability_name)
+            except KeyError:
+                raise WrongAbilityException
+            record = game.perform_move(figure, ability_class(), to_position, time_units)
+            session.notify_changed()
+            channel = self._get_channel(game_id)
+            if channel is not None:
+                channel.publish(encode_move(session.version, record, game))
+            self._watch_flag(session)
+        return session
+
+    async def analyse(
+        self,
+        game_id: str,
+        executor: Executor,
+        max_depth: int = 4,
+        max_time: float | None = None,
+        max_nodes: int | None = None,
+    ) -> AnalysisResult:
+        """Поиск хода в пуле процессов; позиция уходит туда снапшотом"""
+        session = self.get(game_id)
+        async with session.lock:
+            snapshot = session.game.snapshot()
+            key = cache_key(session.game)
+        if self.cache is not None:
+            # при кэше на диске get может читать sqlite - не в event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None and cached.depth >= max_depth:
+                if cached.ability_id < 0:
+                    return AnalysisResult(0, None, None, None, cached.score, cached.depth, 0, 0.0)
+                return AnalysisResult(
+                    0,
+                    cached.from_square,
+                    cached.to_square,
+                    ABILITIES.get(cached.ability_id),
+                    cached.score,
+                    cached.depth,
+                    0,
+                    0.0,
+                )
+        result = await asyncio.get_running_loop().run_in_executor(
+            executor, analyse_snapshot, 0, snapshot, max_depth, max_nodes, max_time
+        )
+        if self.cache is not None and result.depth:
+            if result.ability is None:
+                cached = CachedAnalysis(result.score, result.depth)
+            else:
+                cached = CachedAnalysis(
+                    result.score, result.depth, result.from_square, result.to_square, result.ability.type_id
+                )
+            await asyncio.to_thread(self.cache.put, key, cached)
+        return result
+
@@ -0,0 +1,144 @@
+"""Опциональная инструментация горячих путей
+
+По умолчанию ничего не подменяется и накладных расходов нет. enable() оборачивает
+ChessBoard.get_figure_by_position, is_can_perform каждой зарегистрированной абилки и
+ChessGame.perform_move/make_move счётчиками и гистограммами времени; disable() возвращает
+исходные методы.
+"""
+import cProfile
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from game_logic.chess_board import ChessBoard
+from game_logic.chess_game import ChessGame
+from game_logic.figure_abilities import MoveAbility
+from game_logic.registry import ABILITIES
+
+# верхние границы корзин гистограммы в секундах: 250нс * 2^i
+LATENCY_BUCKETS = tuple(250e-9 * 2 ** i for i in range(16))
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+
+class Metrics:
+    def __init__(self):
+        self.latency: dict[str, Histogram] = {}
+        # name -> функция, возвращающая (попадания, всего обращений)
+        self.cache_sources: dict[str, Callable[[], tuple[int, int]]] = {}
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.latency.get(name)
+        if histogram is None:
+            histogram = self.latency[name] = Histogram()
+        return histogram
+
+    def register_cache(self, name: str, stats: Callable[[], tuple[int, int]]) -> None:
+        self.cache_sources[name] = stats
+
+    def reset(self) -> None:
+        for histogram in self.latency.values():
+            histogram.counts = [0] * len(histogram.counts)
+            histogram.count = 0
+            histogram.sum = 0.0
+
+    def export_prometheus(self, prefix: str = "omegachess") -> str:
+        """Снимок метрик в текстовом формате Prometheus"""
+        lines = [f"# TYPE {prefix}_calls_total counter"]
+        for name, histogram in sorted(self.latency.items()):
+            lines.append(f'{prefix}_calls_total{{function="{name}"}} {histogram.count}')
+        lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+        for name, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{prefix}_latency_seconds_bucket{{function="{name}",le="{bound:.3g}"}} {cumulative}')
+            lines.append(f'{prefix}_latency_seconds_bucket{{function="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_latency_seconds_sum{{function="{name}"}} {histogram.sum:.9f}')
+            lines.append(f'{prefix}_latency_seconds_count{{function="{name}"}} {histogram.count}')
+        lines.append(f"# TYPE {prefix}_cache_hit_ratio gauge")
+        for name, stats in sorted(self.cache_sources.items()):
+            hits, total = stats()
+            ratio = hits / total if total else 0.0
+            lines.append(f'{prefix}_cache_hit_ratio{{cache="{name}"}} {ratio:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# (класс, имя атрибута, исходное значение из __dict__ класса или None, если метод был унаследован)
+_patched: list[tuple[type, str, object]] = []
+
+
+def _timed(name: str, function: Callable) -> Callable:
+    histogram = metrics.histogram(name)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return wrapper
+
+
+def _patch(owner: type, attribute: str) -> None:
+    _patched.append((owner, attribute, owner.__dict__.get(attribute)))
+    setattr(owner, attribute, _timed(f"{owner.__name__}.{attribute}", getattr(owner, attribute)))
+
+
+def is_enabled() -> bool:
+    return bool(_patched)
+
+
+def enable() -> None:
+    if is_enabled():
+        return
+    _patch(ChessBoard, "get_figure_by_position")
+    _patch(ChessGame, "perform_move")
+    _patch(ChessGame, "make_move")
+    for ability_class in ABILITIES.types:
+        if issubclass(ability_class, MoveAbility):
+            _patch(ability_class, "is_can_perform")
+
+
+def disable() -> None:
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        if original is None:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+
+
+@contextmanager
+def profile_replay(output_path: str) -> Iterator[cProfile.Profile]:
+    """Профилирует блок (например, проигрывание одной партии) через cProfile
+
+    Результат сохраняется в формате pstats: его читают snakeviz, gprof2dot и flameprof
+    (последний строит flamegraph).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
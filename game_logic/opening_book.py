@@ -0,0 +1,143 @@
+"""Дебютная книга: отсортированная таблица ключ позиции -> ходы с весами
+
+Строится из записей партий (game_record):
+
+    python -m game_logic.opening_book games.bin book.bin --max-ply 16
+
+Файл: заголовок BOOK_HEADER (магия b"OMOB", версия, число записей), затем записи
+ENTRY (ChessGame.board_key, ход в формате game_record без времени, вес), отсортированные
+по ключу. Во время работы файл отображается в память (mmap) и ищется двоичным поиском,
+поэтому загрузка ничего не разбирает, а процессы сервиса делят одни и те же страницы.
+"""
+import argparse
+import mmap
+import random
+import struct
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_game import ChessGame
+from game_logic.exceptions import IllegalMoveException, WrongAbilityException
+from game_logic.figure_abilities import MoveAbility
+from game_logic.game_record import GameRecord, GameRecordFile, decode_move
+
+MAGIC = b"OMOB"
+VERSION = 1
+BOOK_HEADER = struct.Struct("<4sBQ")
+ENTRY = struct.Struct("<QII")
+# в книге хранятся только клетки и абилка
+MOVE_MASK = 0xFFFF
+
+
+class BookMove(NamedTuple):
+    from_square: int
+    to_square: int
+    ability: type[MoveAbility]
+    weight: int
+
+
+class BadBookException(Exception):
+    """Повреждённый или чужой файл книги"""
+
+
+def collect_book_moves(games: Iterable[GameRecord], max_ply: int = 16) -> Counter:
+    """Считает ходы первых max_ply полуходов каждой партии: Counter[(ключ позиции, ход)]"""
+    counter = Counter()
+    for record in games:
+        game = ChessGame.from_snapshot(record.snapshot)
+        for ply, value in enumerate(record.moves):
+            if ply >= max_ply:
+                break
+            move = decode_move(value)
+            figure = game.board.get_figure_by_square(move.from_square)
+            if figure is None:
+                break
+            key = game.board_key
+            try:
+                game.perform_move(figure, move.ability(), BoardPosition.from_index(move.to_square), move.time_units)
+            except (IllegalMoveException, WrongAbilityException):
+                break
+            counter[key, value & MOVE_MASK] += 1
+    return counter
+
+
+def write_book(path: str, counter: Counter) -> int:
+    """Пишет книгу, возвращает число записей"""
+    entries = sorted(((key, move, weight) for (key, move), weight in counter.items()),
+                     key=lambda entry: (entry[0], -entry[2], entry[1]))
+    with open(path, "wb") as file:
+        file.write(BOOK_HEADER.pack(MAGIC, VERSION, len(entries)))
+        for entry in entries:
+            file.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+def build_book(games_path: str, book_path: str, max_ply: int = 16) -> int:
+    with GameRecordFile(games_path) as games:
+        counter = collect_book_moves((games.game_at(offset) for offset in games.offsets()), max_ply)
+    return write_book(book_path, counter)
+
+
+class OpeningBook:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = BOOK_HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or len(self._mmap) < BOOK_HEADER.size + self.size * ENTRY.size:
+            self.close()
+            raise BadBookException
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from("<Q", self._mmap, BOOK_HEADER.size + index * ENTRY.size)[0]
+
+    def lookup(self, key: int) -> list[BookMove]:
+        """Ходы для позиции, по убыванию веса"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        for index in range(low, self.size):
+            entry_key, value, weight = ENTRY.unpack_from(self._mmap, BOOK_HEADER.size + index * ENTRY.size)
+            if entry_key != key:
+                break
+            move = decode_move(value)
+            moves.append(BookMove(move.from_square, move.to_square, move.ability, weight))
+        return moves
+
+    def lookup_game(self, game: ChessGame) -> list[BookMove]:
+        return self.lookup(game.board_key)
+
+    def choose(self, game: ChessGame, rng: random.Random | None = None) -> BookMove | None:
+        """Случайный ход из книги с вероятностью, пропорциональной весу"""
+        moves = self.lookup_game(game)
+        if not moves:
+            return None
+        return (rng or random).choices(moves, weights=[move.weight for move in moves])[0]
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Строит дебютную книгу из файла партий")
+    parser.add_argument("games", help="файл партий в формате game_record")
+    parser.add_argument("book", help="куда записать книгу")
+    parser.add_argument("--max-ply", type=int, default=16)
+    args = parser.parse_args(argv)
+    print(f"{build_book(args.games, args.book, args.max_ply)} entries written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Параллельный поиск и пакетный анализ позиций в пуле процессов
+
+Позиции передаются воркерам как снапшоты ChessGame (81 байт), а не как граф объектов.
+"""
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, NamedTuple
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.engine import Engine, SearchMove, SearchResult, MATE_SCORE, MATE_BOUND, DEFAULT_MOVE_COST
+from game_logic.exceptions import IllegalMoveException
+from game_logic.figure_abilities import MoveAbility
+
+
+class AnalysisResult(NamedTuple):
+    """Результат анализа одной позиции; ход задан номерами клеток и классом абилки"""
+    index: int
+    from_square: int | None
+    to_square: int | None
+    ability: type[MoveAbility] | None
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+
+# движки живут в воркере между задачами, чтобы переиспользовать таблицу транспозиций;
+# у каждой функции стоимости хода свой движок (None - DEFAULT_MOVE_COST)
+_worker_engines: dict[object, Engine] = {}
+
+
+def _get_worker_engine(time_cost=None) -> Engine:
+    engine = _worker_engines.get(time_cost)
+    if engine is None:
+        engine = _worker_engines[time_cost] = Engine(time_cost=time_cost)
+    return engine
+
+
+def analyse_snapshot(
+    index: int, snapshot: bytes, max_depth: int, max_nodes: int | None, max_time: float | None
+) -> AnalysisResult:
+    game = ChessGame.from_snapshot(snapshot)
+    result = _get_worker_engine().search(game, max_depth=max_depth, max_nodes=max_nodes, max_time=max_time)
+    move = result.best_move
+    if move is None:
+        return AnalysisResult(index, None, None, None, result.score, result.depth, result.nodes, result.elapsed)
+    return AnalysisResult(
+        index,
+        move.figure.square,
+        move.to_position.index,
+        move.ability,
+        result.score,
+        result.depth,
+        result.nodes,
+        result.elapsed,
+    )
+
+
+def _search_root_move(
+    index: int,
+    snapshot: bytes,
+    from_square: int,
+    to_square: int,
+    ability: type[MoveAbility],
+    time_units: int,
+    max_depth: int,
+    max_nodes: int | None,
+    max_time: float | None,
+    time_cost=None,
+) -> AnalysisResult:
+    """Делает корневой ход и ищет ответ соперника на глубину max_depth - 1"""
+    started = time.perf_counter()
+    game = ChessGame.from_snapshot(snapshot)
+    figure = game.board.get_figure_by_square(from_square)
+    try:
+        game.make_move(figure, ability(), BoardPosition.from_index(to_square), time_units)
+    except IllegalMoveException:
+        return AnalysisResult(index, None, None, None, -MATE_SCORE - 1, 0, 0, time.perf_counter() - started)
+    engine = _get_worker_engine(time_cost)
+    own_time = game.white_time if figure.color == FigureColor.WHITE else game.black_time
+    if own_time < 0:
+        score, depth, nodes = -MATE_SCORE + 1, max_depth, 0
+    elif next(game.board.all_legal_moves(game.side_to_move), None) is None:
+        # у соперника нет ходов: мат или пат, поиск за него вернул бы 0
+        score = MATE_SCORE - 1 if game.board.is_in_check(game.side_to_move) else 0
+        depth, nodes = max_depth, 1
+    elif max_depth <= 1:
+        score, depth, nodes = -engine.evaluate(game), 1, 1
+    else:
+        result = engine.search(game, max_depth=max_depth - 1, max_nodes=max_nodes, max_time=max_time)
+        score, depth, nodes = -result.score, result.depth + 1, result.nodes
+        if abs(score) >= MATE_BOUND:
+            # поиск ответа считает полуходы от позиции после корневого хода, а от корня мат на полуход дальше
+            score -= 1 if score > 0 else -1
+    return AnalysisResult(
+        index, from_square, to_square, ability, score, depth, nodes, time.perf_counter() - started
+    )
+
+
+def analyse_batch(
+    snapshots: Iterable[bytes],
+    max_depth: int = 4,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    executor: Executor | None = None,
+    workers: int | None = None,
+) -> Iterator[AnalysisResult]:
+    """Анализирует независимые позиции (снапшоты ChessGame) в пуле процессов
+
+    Результаты отдаются по мере готовности; поле index указывает на позицию во входных данных.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [
+            executor.submit(analyse_snapshot, index, snapshot, max_depth, max_nodes, max_time)
+            for index, snapshot in enumerate(snapshots)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def parallel_search(
+    game: ChessGame,
+    max_depth: int = 4,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    executor: Executor | None = None,
+    workers: int | None = None,
+    time_cost=None,
+) -> SearchResult:
+    """Поиск с разделением корневых ходов между процессами
+
+    max_nodes и max_time ограничивают поиск каждого корневого хода. time_cost передаётся
+    воркерам, поэтому должен сериализоваться pickle (например, функция уровня модуля).
+    """
+    started = time.perf_counter()
+    snapshot = game.snapshot()
+    root_moves = []
+    for figure, ability_class, to_position in game.board.all_legal_moves(game.side_to_move):
+        time_units = time_cost(figure, ability_class, to_position) if time_cost else DEFAULT_MOVE_COST
+        root_moves.append(SearchMove(figure, ability_class, to_position, time_units))
+    if not root_moves:
+        score = -MATE_SCORE if game.board.is_in_check(game.side_to_move) else 0
+        return SearchResult(None, score, 0, 0, time.perf_counter() - started)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [
+            executor.submit(
+                _search_root_move,
+                index,
+                snapshot,
+                move.figure.square,
+                move.to_position.index,
+                move.ability,
+                move.time_units,
+                max_depth,
+                max_nodes,
+                max_time,
+                time_cost,
+            )
+            for index, move in enumerate(root_moves)
+        ]
+        results = [future.result() for future in as_completed(futures)]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    legal_results = [result for result in results if result.from_square is not None]
+    if not legal_results:
+        return SearchResult(None, 0, 0, 0, time.perf_counter() - started)
+    best = max(legal_results, key=lambda result: (result.score, -result.index))
+    return SearchResult(
+        root_moves[best.index],
+        best.score,
+        min(result.depth for result in legal_results),
+        sum(result.nodes for result in results),
+        time.perf_counter() - started,
+    )
@@ -0,0 +1,30 @@
+"""Perft: число листьев дерева ходов заданной глубины, эталон для проверки генерации ходов"""
+from game_logic.chess_board import ChessBoard
+from game_logic.constants import FigureColor
+from game_logic.board_position import BoardPosition
+
+
+def perft(board: ChessBoard, color: FigureColor, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = list(board.all_legal_moves(color))
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for figure, _, to_position in moves:
+        from_position = figure.position
+        captured = board.move_figure(figure, to_position)
+        nodes += perft(board, color.opposite, depth - 1)
+        board.unmove_figure(figure, from_position, captured)
+    return nodes
+
+
+def divide(board: ChessBoard, color: FigureColor, depth: int) -> dict[tuple[BoardPosition, BoardPosition], int]:
+    """Perft с разбивкой по первому ходу, удобно для поиска расхождений"""
+    result = {}
+    for figure, _, to_position in list(board.all_legal_moves(color)):
+        from_position = figure.position
+        captured = board.move_figure(figure, to_position)
+        result[from_position, to_position] = perft(board, color.opposite, depth - 1)
+        board.unmove_figure(figure, from_position, captured)
+    return result
@@ -0,0 +1,67 @@
+"""Реестр типов фигур и абилок с небольшими целыми номерами
+
+Номера используются в снапшотах, записях партий и масках абилок фигур,
+поэтому выдаются в порядке регистрации и не должны меняться.
+"""
+
+
+class TypeRegistry:
+    def __init__(self, name: str, first_id: int, max_id: int):
+        self.name = name
+        self.first_id = first_id
+        self.max_id = max_id
+        self.types: list[type] = []
+
+    def register(self, registered_type: type) -> int:
+        """Выдаёт типу номер (повторная регистрация возвращает уже выданный)"""
+        type_id = registered_type.__dict__.get("type_id")
+        if type_id is not None:
+            return type_id
+        type_id = self.first_id + len(self.types)
+        if type_id > self.max_id:
+            raise OverflowError(f"Too many {self.name} types registered")
+        registered_type.type_id = type_id
+        self.types.append(registered_type)
+        return type_id
+
+    def unregister(self, registered_type: type) -> None:
+        """Снимает последний зарегистрированный тип, например временный тип из теста
+
+        Снять можно только последний: номера остальных типов не должны меняться.
+        """
+        if not self.types or self.types[-1] is not registered_type:
+            raise ValueError(f"Only the last registered {self.name} type can be unregistered")
+        self.types.pop()
+        del registered_type.type_id
+
+    def get(self, type_id: int) -> type:
+        index = type_id - self.first_id
+        if not 0 <= index < len(self.types):
+            raise KeyError(type_id)
+        return self.types[index]
+
+    def get_by_name(self, name: str) -> type:
+        for registered_type in self.types:
+            if registered_type.__name__ == name:
+                return registered_type
+        raise KeyError(name)
+
+
+class Singleton:
+    """Один общий экземпляр на каждый класс иерархии
+
+    Для типов без состояния (фигуры, абилки): их экземпляры можно сравнивать через is
+    и не создавать заново при каждом ходе.
+    """
+    def __new__(cls):
+        instance = cls.__dict__.get("_instance")
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+
+# код фигуры в снапшоте - signed byte, 0 - пустая клетка
+FIGURES = TypeRegistry("figure", first_id=1, max_id=127)
+# номер абилки занимает 4 бита в записи хода
+ABILITIES = TypeRegistry("ability", first_id=0, max_id=15)
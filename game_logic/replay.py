@@ -0,0 +1,194 @@
+"""Потоковая перепроверка записанных партий по текущим правилам
+
+    python -m game_logic.replay games.bin --chunk-size 512 --workers 8
+
+Родительский процесс читает из файла только заголовки партий и раздаёт воркерам
+пачки смещений; воркер сам отображает файл в память и переигрывает партии на одной
+переиспользуемой игре (make/unmake), поэтому память не растёт с размером архива.
+Для каждой партии сообщается первый недопустимый ход.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, NamedTuple
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard
+from game_logic.chess_game import ChessGame
+from game_logic.exceptions import IllegalMoveException, SamePositionException, WrongAbilityException
+from game_logic.game_record import BadRecordException, GameRecord, GameRecordFile
+from game_logic.registry import ABILITIES
+
+
+class ReplayResult(NamedTuple):
+    """Итог партии: сколько ходов допустимо и номер первого недопустимого хода (None - все ходы верны)"""
+    offset: int
+    moves: int
+    illegal_ply: int | None = None
+    reason: str | None = None
+
+
+class ReplayStats:
+    """Счётчики прогона; results не хранятся, поэтому память не зависит от размера архива"""
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.illegal_games = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result: ReplayResult) -> None:
+        self.games += 1
+        self.moves += result.moves
+        if result.illegal_ply is not None:
+            self.illegal_games += 1
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.elapsed if self.elapsed else 0.0
+
+
+class GameReplayer:
+    """Переигрывает партии на одной и той же игре
+
+    Если партия начинается с той же позиции, что и предыдущая, ходы предыдущей
+    просто отменяются; иначе в доску загружается новый снапшот.
+    """
+    def __init__(self):
+        self.game = ChessGame(board=ChessBoard(), time_units=0)
+        self._start: bytes | None = None
+
+    def _prepare(self, snapshot: bytes) -> ChessGame:
+        game = self.game
+        if snapshot == self._start:
+            while game.undo_stack:
+                game.unmake_move()
+        else:
+            game.load_snapshot(snapshot)
+            self._start = snapshot
+        return game
+
+    def replay(self, offset: int, record: GameRecord) -> ReplayResult:
+        game = self._prepare(record.snapshot)
+        board = game.board
+        for ply, value in enumerate(record.moves):
+            figure = board.get_figure_by_square(value & 0x3F)
+            if figure is None:
+                return ReplayResult(offset, ply, ply, "EmptySquare")
+            try:
+                ability = ABILITIES.get(value >> 12 & 0xF)
+            except KeyError:
+                return ReplayResult(offset, ply, ply, "UnknownAbility")
+            try:
+                game.make_move(figure, ability(), BoardPosition.from_index(value >> 6 & 0x3F), value >> 16)
+            except (IllegalMoveException, WrongAbilityException, SamePositionException) as exception:
+                return ReplayResult(offset, ply, ply, type(exception).__name__)
+        return ReplayResult(offset, len(record.moves))
+
+
+def replay_records(records: Iterable[tuple[int, GameRecord]]) -> Iterator[ReplayResult]:
+    """Переигрывает партии в текущем процессе; records - пары (смещение, партия), как у read_games"""
+    replayer = GameReplayer()
+    for offset, record in records:
+        yield replayer.replay(offset, record)
+
+
+# воркер держит открытые файлы и игру между пачками
+_worker_files: dict[str, GameRecordFile] = {}
+_worker_replayer: GameReplayer | None = None
+
+
+def _worker_file(path: str) -> GameRecordFile:
+    games = _worker_files.get(path)
+    if games is not None and os.path.getsize(path) > games.size:
+        # файл дописан после того, как воркер его отобразил: новые партии за концом старого отображения
+        games.close()
+        games = None
+    if games is None:
+        games = _worker_files[path] = GameRecordFile(path)
+    return games
+
+
+def replay_chunk(path: str, offsets: list[int]) -> list[ReplayResult]:
+    global _worker_replayer
+    games = _worker_file(path)
+    if _worker_replayer is None:
+        _worker_replayer = GameReplayer()
+    results = []
+    for offset in offsets:
+        try:
+            record = games.game_at(offset)
+        except BadRecordException:
+            # повреждённая запись - итог этой партии, а не всего прогона
+            results.append(ReplayResult(offset, 0, 0, BadRecordException.__name__))
+            continue
+        results.append(_worker_replayer.replay(offset, record))
+    return results
+
+
+def _chunks(offsets: Iterator[int], chunk_size: int) -> Iterator[list[int]]:
+    chunk = []
+    for offset in offsets:
+        chunk.append(offset)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def replay_file(
+    path: str,
+    chunk_size: int = 512,
+    executor: Executor | None = None,
+    workers: int | None = None,
+) -> Iterator[ReplayResult]:
+    """Переигрывает все партии файла в пуле процессов
+
+    Результаты отдаются пачками по мере готовности. В работе одновременно не больше
+    двух пачек на воркер, так что чтение файла не убегает вперёд проверки.
+    """
+    workers = workers or os.cpu_count()
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with GameRecordFile(path) as games:
+            chunks = _chunks(games.offsets(), chunk_size)
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(replay_chunk, path, chunk))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Перепроверяет партии из файла по текущим правилам")
+    parser.add_argument("games", help="файл партий в формате game_record")
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    stats = ReplayStats()
+    for result in replay_file(args.games, args.chunk_size, workers=args.workers):
+        stats.add(result)
+        if result.illegal_ply is not None:
+            print(f"game at {result.offset}: illegal move {result.illegal_ply} ({result.reason})")
+    print(
+        f"{stats.games} games, {stats.moves} moves, {stats.illegal_games} with illegal moves, "
+        f"{stats.moves_per_second:.0f} moves/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
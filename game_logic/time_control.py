@@ -0,0 +1,154 @@
+"""Контроль времени: добавление, задержка, журнал времени ходов и планировщик падения флага"""
+import asyncio
+import logging
+from array import array
+from typing import Callable, NamedTuple
+
+from game_logic.constants import FigureColor
+
+logger = logging.getLogger(__name__)
+
+
+class TimeControl(NamedTuple):
+    """increment добавляется после каждого хода, первые delay единиц хода не списываются"""
+    increment: int = 0
+    delay: int = 0
+
+    def spend(self, time_left: int, time_units: int) -> tuple[int, int]:
+        """Возвращает (остаток времени после хода, списанное время)"""
+        spent = max(0, time_units - self.delay)
+        time_left -= spent
+        if time_left >= 0:
+            time_left += self.increment
+        return time_left, spent
+
+
+class MoveTimeLog:
+    """Время каждого хода в заранее выделенном массиве; при заполнении ёмкость удваивается"""
+    def __init__(self, capacity: int = 128):
+        self._spent = array("i", bytes(4 * capacity))
+        self._length = 0
+
+    def append(self, spent: int) -> None:
+        if self._length == len(self._spent):
+            self._spent.extend(array("i", bytes(4 * len(self._spent))))
+        self._spent[self._length] = spent
+        self._length += 1
+
+    def clear(self) -> None:
+        self._length = 0
+
+    def pop(self) -> int:
+        self._length -= 1
+        return self._spent[self._length]
+
+    def total(self, color: FigureColor, first_color: FigureColor = FigureColor.WHITE) -> int:
+        """Сумма времени ходов стороны color; first_color - кто ходил первым"""
+        start = 0 if color == first_color else 1
+        return sum(self._spent[start:self._length:2])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        return self._spent[index % self._length]
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[[], None]):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Одно колесо таймеров на все игры процесса
+
+    Вместо таймера asyncio на каждую игру - одна задача, которая раз в tick секунд
+    проворачивает колесо из slots ячеек и вызывает наступившие таймеры. Точность - tick.
+    """
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self._slots: list[list[TimerHandle]] = [[] for _ in range(slots)]
+        self._position = 0
+        self._time = 0.0
+        self._task: asyncio.Task | None = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        handle = TimerHandle(self._time + max(delay, 0.0), callback)
+        ticks = max(1, int(-(-max(delay, 0.0) // self.tick)))
+        self._slots[(self._position + ticks) % len(self._slots)].append(handle)
+        return handle
+
+    def advance(self) -> None:
+        """Сдвигает колесо на один tick и вызывает наступившие таймеры"""
+        self._time += self.tick
+        self._position = (self._position + 1) % len(self._slots)
+        slot = self._slots[self._position]
+        pending = []
+        for handle in slot:
+            if handle.cancelled:
+                continue
+            if handle.deadline <= self._time + self.tick / 2:
+                # колесо одно на все игры: ошибка одного таймера не должна останавливать остальные
+                try:
+                    handle.callback()
+                except Exception:
+                    logger.exception("Timer callback failed")
+            else:
+                # таймер дальше одного оборота колеса
+                pending.append(handle)
+        slot[:] = pending
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.advance()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class FlagScheduler:
+    """Следит за флагами живых игр: на каждую игру один таймер в общем колесе
+
+    unit_seconds - сколько секунд реального времени в одной единице времени игры.
+    """
+    def __init__(self, wheel: TimerWheel, unit_seconds: float = 1.0):
+        self.wheel = wheel
+        self.unit_seconds = unit_seconds
+        self._handles: dict[str, TimerHandle] = {}
+
+    def watch(self, game_id: str, time_left: int, on_flag: Callable[[], None]) -> None:
+        """(Пере)запускает таймер игры: on_flag вызовется, если ход не сделан за time_left единиц"""
+        self.cancel(game_id)
+
+        def fire():
+            self._handles.pop(game_id, None)
+            on_flag()
+
+        self._handles[game_id] = self.wheel.schedule(time_left * self.unit_seconds, fire)
+
+    def cancel(self, game_id: str) -> None:
+        handle = self._handles.pop(game_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def __len__(self) -> int:
+        return len(self._handles)
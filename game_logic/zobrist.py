@@ -0,0 +1,43 @@
+"""Zobrist-ключи позиций
+
+Ключи детерминированы (не зависят от процесса и запуска), поэтому хэши можно
+сохранять на диск и сравнивать между воркерами.
+"""
+import hashlib
+
+from game_logic.constants import FigureColor
+from game_logic.bitboard import BOARD_SIZE
+
+MASK_64 = (1 << 64) - 1
+
+_figure_keys: dict[tuple[type, FigureColor], tuple[int, ...]] = {}
+
+
+def _key(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+def get_figure_keys(figure_type: type, color: FigureColor) -> tuple[int, ...]:
+    """64 ключа (по одному на клетку) для фигуры данного типа и цвета"""
+    keys = _figure_keys.get((figure_type, color))
+    if keys is None:
+        name = f"{figure_type.__module__}.{figure_type.__qualname__}:{color.value}"
+        keys = tuple(_key(f"{name}:{square}") for square in range(BOARD_SIZE))
+        _figure_keys[figure_type, color] = keys
+    return keys
+
+
+BLACK_TO_MOVE_KEY = _key("black_to_move")
+
+
+def _mix(value: int) -> int:
+    """splitmix64"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+def clock_key(white_time: int, black_time: int) -> int:
+    """Ключ состояния часов"""
+    return _mix(white_time & 0xFFFFFFFF | (black_time & 0xFFFFFFFF) << 32)
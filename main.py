@@ -1,7 +1,143 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from game_logic.board_position import BoardPosition
+from game_logic.board_setup import BadFenException, board_from_compact_key, board_from_fen, standard_board
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.constants import FigureColor
+from game_logic.exceptions import (
+    GameNotFoundException,
+    IllegalMoveException,
+    OutOfBoardException,
+    SamePositionException,
+    TimeOverException,
+    WrongAbilityException,
+    WrongTurnException,
+)
+from game_logic.registry import FIGURES
+from game_logic.game_registry import GameRegistry, GameSession
+from game_logic.eval_cache import EvaluationCache, shared_cache
+from game_logic.game_record import MAX_MOVE_TIME
+from game_logic.opening_book import OpeningBook
+from game_logic.broadcast import BroadcastHub, SubscriberLagged, encode_snapshot
+from game_logic.time_control import FlagScheduler, TimeControl, TimerWheel
+from game_logic import instrumentation
 
 app = FastAPI()
 
+if os.environ.get("OMEGACHESS_EVAL_CACHE_PATH"):
+    evaluation_cache = EvaluationCache(path=os.environ["OMEGACHESS_EVAL_CACHE_PATH"])
+else:
+    evaluation_cache = shared_cache
+instrumentation.metrics.register_cache("evaluation", evaluation_cache.stats)
+
+# одно колесо таймеров на процесс следит за флагами всех игр
+timer_wheel = TimerWheel()
+flag_scheduler = FlagScheduler(timer_wheel, unit_seconds=float(os.environ.get("OMEGACHESS_TIME_UNIT_SECONDS", "1")))
+broadcast_hub = BroadcastHub()
+# игры без ходов дольше GAME_TTL секунд и законченные дольше FINISHED_GAME_TTL назад удаляются
+GAME_TTL = float(os.environ.get("OMEGACHESS_GAME_TTL", "3600"))
+FINISHED_GAME_TTL = float(os.environ.get("OMEGACHESS_FINISHED_GAME_TTL", "300"))
+EVICTION_INTERVAL = 60.0
+# подсказка занимает воркер пула поиска, поэтому её глубина и бюджет ограничены
+MAX_HINT_DEPTH = 6
+HINT_MAX_TIME = 2.0
+HINT_MAX_NODES = 200_000
+# зритель, которого пришлось пересинхронизировать столько раз, отключается
+MAX_SPECTATOR_RESYNCS = 3
+registry = GameRegistry(cache=evaluation_cache, flags=flag_scheduler, broadcast=broadcast_hub)
+
+# книга отображается в память при импорте; страницы файла общие для всех воркеров
+opening_book = OpeningBook(os.environ["OMEGACHESS_OPENING_BOOK"]) if os.environ.get("OMEGACHESS_OPENING_BOOK") else None
+search_executor = ProcessPoolExecutor()
+
+if os.environ.get("OMEGACHESS_INSTRUMENTATION") == "1":
+    instrumentation.enable()
+
+
+class FigureModel(BaseModel):
+    type: str
+    color: FigureColor
+    x: int
+    y: int
+
+
+class CreateGameModel(BaseModel):
+    # расстановка задаётся одним из трёх способов; если не задана - начальная позиция
+    figures: list[FigureModel] | None = None
+    fen: str | None = None
+    key: str | None = None
+    time_units: int
+    increment: int = 0
+    delay: int = 0
+
+
+class MoveModel(BaseModel):
+    from_x: int
+    from_y: int
+    ability: str
+    to_x: int
+    to_y: int
+    # ход должен помещаться в запись партии (game_record)
+    time_units: int = Field(ge=0, le=MAX_MOVE_TIME)
+
+
+def game_state(session: GameSession) -> dict:
+    game = session.game
+    return {
+        "game_id": session.game_id,
+        "version": session.version,
+        "white_time": game.white_time,
+        "black_time": game.black_time,
+        "side_to_move": game.side_to_move.value,
+        "flagged": game.flagged.value if game.flagged is not None else None,
+        "figures": [
+            {
+                "type": type(figure.figure).__name__,
+                "color": figure.color.value,
+                "x": figure.position.x,
+                "y": figure.position.y,
+            }
+            for figure in game.board.figures
+        ],
+    }
+
+
+def get_session(game_id: str) -> GameSession:
+    try:
+        return registry.get(game_id)
+    except GameNotFoundException:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+
+async def evict_games():
+    while True:
+        await asyncio.sleep(EVICTION_INTERVAL)
+        registry.evict(GAME_TTL, FINISHED_GAME_TTL)
+        # дозаписываем на диск неполную пачку кэша анализа
+        await asyncio.to_thread(evaluation_cache.flush)
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    timer_wheel.start()
+    app.state.eviction_task = asyncio.create_task(evict_games())
+
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    timer_wheel.stop()
+    app.state.eviction_task.cancel()
+    search_executor.shutdown(cancel_futures=True)
+    evaluation_cache.close()
+    if opening_book is not None:
+        opening_book.close()
+
 
 @app.get("/")
 async def root():
@@ -11,3 +147,164 @@ async def root():
 @app.get("/hello/{name}")
 async def say_hello(name: str):
     return {"message": f"Hello {name}"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return instrumentation.metrics.export_prometheus()
+
+
+@app.post("/games")
+async def create_game(data: CreateGameModel):
+    try:
+        if data.fen is not None:
+            board = board_from_fen(data.fen)
+        elif data.key is not None:
+            board = board_from_compact_key(data.key)
+        elif data.figures is not None:
+            board = ChessBoard(figures=[
+                BoardFigure(
+                    figure=FIGURES.get_by_name(figure.type)(),
+                    position=BoardPosition(figure.x, figure.y),
+                    color=figure.color,
+                )
+                for figure in data.figures
+            ])
+        else:
+            board = standard_board()
+    except BadFenException:
+        raise HTTPException(status_code=400, detail="Bad board description")
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Unknown figure type")
+    except OutOfBoardException:
+        raise HTTPException(status_code=400, detail="Position out of board")
+    except SamePositionException:
+        raise HTTPException(status_code=400, detail="Several figures on one position")
+    return game_state(registry.create(board, data.time_units, TimeControl(data.increment, data.delay)))
+
+
+@app.get("/games/{game_id}")
+async def get_game(game_id: str):
+    return game_state(get_session(game_id))
+
+
+@app.post("/games/{game_id}/moves")
+async def perform_move(game_id: str, data: MoveModel):
+    get_session(game_id)
+    try:
+        session = await registry.perform_move(
+            game_id,
+            BoardPosition(data.from_x, data.from_y),
+            data.ability,
+            BoardPosition(data.to_x, data.to_y),
+            data.time_units,
+        )
+    except OutOfBoardException:
+        raise HTTPException(status_code=400, detail="Position out of board")
+    except WrongAbilityException:
+        raise HTTPException(status_code=400, detail="Figure has no such ability")
+    except TimeOverException:
+        raise HTTPException(status_code=409, detail="Time is over")
+    except WrongTurnException:
+        raise HTTPException(status_code=409, detail="Not your turn")
+    except IllegalMoveException:
+        raise HTTPException(status_code=400, detail="Illegal move")
+    return game_state(session)
+
+
+@app.get("/games/{game_id}/hint")
+async def get_hint(game_id: str, depth: int = 3):
+    session = get_session(game_id)
+    depth = max(1, min(depth, MAX_HINT_DEPTH))
+    if opening_book is not None:
+        book_move = opening_book.choose(session.game)
+        if book_move is not None:
+            from_position = BoardPosition.from_index(book_move.from_square)
+            to_position = BoardPosition.from_index(book_move.to_square)
+            return {
+                "move": {
+                    "from_x": from_position.x,
+                    "from_y": from_position.y,
+                    "ability": book_move.ability.__name__,
+                    "to_x": to_position.x,
+                    "to_y": to_position.y,
+                },
+                "source": "book",
+                "weight": book_move.weight,
+            }
+    result = await registry.analyse(
+        game_id, search_executor, max_depth=depth, max_time=HINT_MAX_TIME, max_nodes=HINT_MAX_NODES
+    )
+    if result.from_square is None:
+        return {"move": None, "score": result.score}
+    from_position = BoardPosition.from_index(result.from_square)
+    to_position = BoardPosition.from_index(result.to_square)
+    return {
+        "move": {
+            "from_x": from_position.x,
+            "from_y": from_position.y,
+            "ability": result.ability.__name__,
+            "to_x": to_position.x,
+            "to_y": to_position.y,
+        },
+        "source": "search",
+        "score": result.score,
+        "depth": result.depth,
+        "nodes": result.nodes,
+    }
+
+
+@app.websocket("/games/{game_id}/ws")
+async def game_updates(websocket: WebSocket, game_id: str):
+    try:
+        session = registry.get(game_id)
+    except GameNotFoundException:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    version = session.version
+    try:
+        await websocket.send_json(game_state(session))
+        while True:
+            version = await session.wait_changed(version)
+            if session.closed:
+                await websocket.close()
+                return
+            await websocket.send_json(game_state(session))
+    except WebSocketDisconnect:
+        pass
+
+
+@app.websocket("/games/{game_id}/spectate")
+async def spectate_game(websocket: WebSocket, game_id: str):
+    """Бинарный поток для зрителей: снапшот, затем дельты ходов (см. game_logic.broadcast)"""
+    try:
+        session = registry.get(game_id)
+    except GameNotFoundException:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    subscriber = broadcast_hub.channel(game_id).subscribe()
+    try:
+        async with session.lock:
+            subscriber.cursor = subscriber.channel.sequence
+            snapshot = encode_snapshot(session.version, session.game)
+        await websocket.send_bytes(snapshot)
+        while True:
+            try:
+                payload = await subscriber.next()
+            except SubscriberLagged:
+                if subscriber.resyncs >= MAX_SPECTATOR_RESYNCS:
+                    await websocket.close(code=1013)
+                    return
+                async with session.lock:
+                    subscriber.resync()
+                    snapshot = encode_snapshot(session.version, session.game)
+                await websocket.send_bytes(snapshot)
+                continue
+            if payload is None:
+                await websocket.close()
+                return
+            await websocket.send_bytes(payload)
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from game_logic.board_position import BoardPosition
+from benchmarks.bench_moves import minor_pieces_board
+
+try:
+    import numpy as np
+    from game_logic.batch_validation import encode_boards, validate_moves
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestBatchValidation(unittest.TestCase):
+    def test_matches_is_can_perform(self):
+        rng = random.Random(1)
+        boards = []
+        moves = []
+        expected = []
+        for _ in range(200):
+            board = minor_pieces_board()
+            for _ in range(rng.randrange(4)):
+                figure, _, to_position = rng.choice(list(board.all_legal_moves(rng.choice(list(board.color_masks)))))
+                board.move_figure(figure, to_position)
+            figure = rng.choice([figure for figure in board.figures if not figure.is_dead])
+            to_position = BoardPosition.from_index(rng.randrange(64))
+            boards.append(board)
+            moves.append((figure.position.index, to_position.index))
+            ability = figure.figure.abilities[0]()
+            expected.append(to_position != figure.position and ability.is_can_perform(board, figure, to_position))
+        result = validate_moves(encode_boards(boards), np.array(moves))
+        self.assertEqual(result.tolist(), expected)
+
+    def test_empty_square_is_illegal(self):
+        boards = encode_boards([minor_pieces_board()])
+        self.assertFalse(validate_moves(boards, np.array([(BoardPosition(4, 4).index, 0)]))[0])
@@ -0,0 +1,77 @@
+import unittest
+
+from game_logic.bitboard import (
+    KNIGHT_ATTACKS,
+    KING_ATTACKS,
+    build_leaper_table,
+    iter_squares,
+    rook_attacks,
+    bishop_attacks,
+)
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.constants import FigureColor
+from game_logic.exceptions import IllegalMoveException
+from game_logic.figure_abilities import LeaperMoveAbility
+from game_logic.figures import Figure, RookFigure
+from game_logic.registry import ABILITIES, FIGURES, TypeRegistry
+
+
+class TestBitboard(unittest.TestCase):
+    def test_leaper_tables(self):
+        self.assertEqual(list(iter_squares(KNIGHT_ATTACKS[0])), [10, 17])
+        self.assertEqual(bin(KING_ATTACKS[27]).count("1"), 8)
+
+    def test_rook_attacks_stop_on_blocker(self):
+        occupied = 1 << 16
+        self.assertEqual(list(iter_squares(rook_attacks(0, occupied))), [1, 2, 3, 4, 5, 6, 7, 8, 16])
+
+    def test_bishop_attacks_all_diagonals(self):
+        occupied = (1 << 36) | (1 << 18)
+        self.assertEqual(
+            list(iter_squares(bishop_attacks(27, occupied))),
+            [6, 13, 18, 20, 34, 36, 41, 48],
+        )
+
+    def test_board_masks_follow_moves(self):
+        rook = BoardFigure(figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE)
+        board = ChessBoard(figures=[rook])
+        board.move_figure(rook, BoardPosition(0, 5))
+        self.assertEqual(board.occupied, 1 << 40)
+        self.assertEqual(board.get_figures_mask(RookFigure, FigureColor.WHITE), 1 << 40)
+        self.assertEqual(board.color_masks[FigureColor.BLACK], 0)
+
+
+class TestVariantAbility(unittest.TestCase):
+    def test_camel_uses_own_table(self):
+        # типы регистрируются при создании класса; снимаем их, чтобы не занимать номера в реестрах
+        class CamelMoveAbility(LeaperMoveAbility):
+            attacks_table = build_leaper_table(
+                ((1, 3), (3, 1), (3, -1), (1, -3), (-1, -3), (-3, -1), (-3, 1), (-1, 3))
+            )
+
+        self.addCleanup(ABILITIES.unregister, CamelMoveAbility)
+
+        class CamelFigure(Figure):
+            abilities = [
+                CamelMoveAbility
+            ]
+
+        self.addCleanup(FIGURES.unregister, CamelFigure)
+        camel = BoardFigure(figure=CamelFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE)
+        board = ChessBoard(figures=[camel])
+        with self.assertRaises(IllegalMoveException):
+            board.perform_action(figure=camel, ability=CamelMoveAbility(), to_position=BoardPosition(1, 2))
+        board.perform_action(figure=camel, ability=CamelMoveAbility(), to_position=BoardPosition(1, 3))
+        self.assertEqual(camel.position, BoardPosition(1, 3))
+
+    def test_unregister_keeps_other_ids(self):
+        registry = TypeRegistry("test", first_id=1, max_id=3)
+        first, second = type("First", (), {}), type("Second", (), {})
+        registry.register(first)
+        registry.register(second)
+        with self.assertRaises(ValueError):
+            registry.unregister(first)
+        registry.unregister(second)
+        self.assertEqual((registry.types, first.type_id), ([first], 1))
+        self.assertEqual(registry.register(second), 2)
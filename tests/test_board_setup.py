@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+from game_logic.board_position import BoardPosition
+from game_logic.board_setup import (
+    STANDARD_START_FEN,
+    BadFenException,
+    board_from_compact_key,
+    board_from_fen,
+    board_to_fen,
+    compact_key,
+    game_from_fen,
+    game_to_fen,
+    standard_board,
+)
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.constants import FigureColor
+from game_logic.exceptions import SamePositionException
+from game_logic.figures import KingFigure, PawnFigure, RookFigure
+
+
+class TestBoardSetup(unittest.TestCase):
+    def test_parse_fen(self):
+        board = board_from_fen("4k3/8/8/8/8/8/P7/R3K3")
+        self.assertIsInstance(board.get_figure_by_position(BoardPosition(0, 0)).figure, RookFigure)
+        self.assertIsInstance(board.get_figure_by_position(BoardPosition(0, 1)).figure, PawnFigure)
+        king = board.get_figure_by_position(BoardPosition(4, 7))
+        self.assertIsInstance(king.figure, KingFigure)
+        self.assertEqual(king.color, FigureColor.BLACK)
+        self.assertEqual(len(board.figures), 4)
+        self.assertEqual(board_to_fen(board), "4k3/8/8/8/8/8/P7/R3K3")
+
+    def test_bad_fen(self):
+        for fen in ("8/8/8", "9/8/8/8/8/8/8/8", "7x/8/8/8/8/8/8/8", "8/8/8/8/8/8/8/7RR"):
+            with self.assertRaises(BadFenException):
+                board_from_fen(fen)
+        with self.assertRaises(BadFenException):
+            game_from_fen(STANDARD_START_FEN + " x", 100)
+
+    def test_game_fen_side_to_move(self):
+        game = game_from_fen("4k3/8/8/8/8/8/8/4K3 b", 100)
+        self.assertEqual(game.side_to_move, FigureColor.BLACK)
+        self.assertEqual(game_to_fen(game), "4k3/8/8/8/8/8/8/4K3 b")
+
+    def test_compact_key_round_trip(self):
+        board = board_from_fen(STANDARD_START_FEN)
+        key = compact_key(board)
+        self.assertEqual(len(key), 128)
+        self.assertEqual(board_from_compact_key(key).snapshot(), board.snapshot())
+        with self.assertRaises(BadFenException):
+            board_from_compact_key("00")
+
+    def test_standard_board_is_independent_copy(self):
+        board = standard_board()
+        self.assertEqual(board_to_fen(board), STANDARD_START_FEN)
+        board.move_figure(board.get_figure_by_position(BoardPosition(1, 0)), BoardPosition(2, 2))
+        self.assertEqual(board_to_fen(standard_board()), STANDARD_START_FEN)
+
+    def test_standard_board_is_not_parsed_again(self):
+        # после первого вызова начальная позиция только копируется, снапшот не разбирается
+        standard_board()
+        with mock.patch("game_logic.board_setup.fen_to_snapshot") as fen_to_snapshot, \
+                mock.patch.object(ChessBoard, "load_snapshot") as load_snapshot:
+            board = standard_board()
+        fen_to_snapshot.assert_not_called()
+        load_snapshot.assert_not_called()
+        self.assertEqual(board_to_fen(board), STANDARD_START_FEN)
+
+    def test_collision_check(self):
+        with self.assertRaises(SamePositionException):
+            ChessBoard(figures=[
+                BoardFigure(figure=RookFigure(), position=BoardPosition(3, 3), color=FigureColor.WHITE),
+                BoardFigure(figure=KingFigure(), position=BoardPosition(3, 3), color=FigureColor.BLACK),
+            ])
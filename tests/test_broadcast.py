@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.broadcast import (
+    KIND_FLAG,
+    KIND_MOVE,
+    BroadcastHub,
+    Delta,
+    GameChannel,
+    SubscriberLagged,
+    decode_delta,
+)
+from game_logic.constants import FigureColor
+from game_logic.figure_abilities import RookMoveAbility
+from game_logic.figures import RookFigure
+from game_logic.game_registry import GameRegistry
+from game_logic.time_control import FlagScheduler, TimerWheel
+from tests.test_game_registry import create_board
+
+
+class TestGameChannel(unittest.IsolatedAsyncioTestCase):
+    async def test_subscribers_share_buffer(self):
+        channel = GameChannel(capacity=4)
+        first = channel.subscribe()
+        second = channel.subscribe()
+        waiter = asyncio.create_task(first.next())
+        await asyncio.sleep(0)
+        channel.publish(b"a")
+        channel.publish(b"b")
+        self.assertEqual(await waiter, b"a")
+        self.assertEqual([await first.next(), await second.next(), await second.next()], [b"b", b"a", b"b"])
+
+    async def test_lagged_subscriber_resyncs(self):
+        channel = GameChannel(capacity=4)
+        subscriber = channel.subscribe(max_lag=2)
+        for payload in (b"a", b"b", b"c"):
+            channel.publish(payload)
+        with self.assertRaises(SubscriberLagged):
+            await subscriber.next()
+        subscriber.resync()
+        channel.publish(b"d")
+        self.assertEqual(await subscriber.next(), b"d")
+        self.assertEqual(subscriber.resyncs, 1)
+
+    async def test_close_ends_stream(self):
+        channel = GameChannel()
+        subscriber = channel.subscribe()
+        waiter = asyncio.create_task(subscriber.next())
+        await asyncio.sleep(0)
+        channel.close()
+        self.assertIsNone(await waiter)
+
+
+class TestRegistryBroadcast(unittest.IsolatedAsyncioTestCase):
+    async def test_move_and_flag_deltas(self):
+        hub = BroadcastHub()
+        wheel = TimerWheel(tick=1.0, slots=8)
+        registry = GameRegistry(shards=2, flags=FlagScheduler(wheel), broadcast=hub)
+        session = registry.create(create_board(), 100)
+        subscriber = hub.channel(session.game_id).subscribe()
+        await registry.perform_move(
+            session.game_id, BoardPosition(0, 0), "RookMoveAbility", BoardPosition(0, 7), 10
+        )
+        await registry.perform_move(
+            session.game_id, BoardPosition(7, 7), "RookMoveAbility", BoardPosition(0, 7), 5
+        )
+        self.assertEqual(
+            decode_delta(await subscriber.next()),
+            Delta(1, KIND_MOVE, 0, 56, RookMoveAbility.type_id, 0, 90, 100),
+        )
+        # побита белая ладья: код как в снапшоте доски
+        self.assertEqual(
+            decode_delta(await subscriber.next()),
+            Delta(2, KIND_MOVE, 63, 56, RookMoveAbility.type_id, RookFigure.type_id, 90, 95),
+        )
+        for _ in range(90):
+            wheel.advance()
+        await asyncio.sleep(0)
+        self.assertEqual(session.game.flagged, FigureColor.WHITE)
+        self.assertEqual(decode_delta(await subscriber.next()).kind, KIND_FLAG)
+        registry.remove(session.game_id)
+        self.assertIsNone(await subscriber.next())
+        self.assertEqual(len(hub), 0)
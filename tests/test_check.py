@@ -0,0 +1,66 @@
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.board_setup import board_from_fen
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.constants import FigureColor
+from game_logic.exceptions import IllegalMoveException
+from game_logic.figure_abilities import RookMoveAbility, KingMoveAbility
+from game_logic.figures import RookFigure, KingFigure, PawnFigure, KnightFigure
+
+
+class TestCheck(unittest.TestCase):
+    def setUp(self):
+        self.white_king = BoardFigure(figure=KingFigure(), position=BoardPosition(4, 0), color=FigureColor.WHITE)
+        self.white_rook = BoardFigure(figure=RookFigure(), position=BoardPosition(4, 1), color=FigureColor.WHITE)
+        self.black_rook = BoardFigure(figure=RookFigure(), position=BoardPosition(4, 7), color=FigureColor.BLACK)
+        self.black_rook2 = BoardFigure(figure=RookFigure(), position=BoardPosition(3, 7), color=FigureColor.BLACK)
+        self.board = ChessBoard(figures=[self.white_king, self.white_rook, self.black_rook, self.black_rook2])
+
+    def test_square_attacked(self):
+        self.assertTrue(self.board.is_square_attacked(BoardPosition(3, 0).index, FigureColor.BLACK))
+        self.assertFalse(self.board.is_square_attacked(BoardPosition(5, 0).index, FigureColor.BLACK))
+        self.assertFalse(self.board.is_in_check(FigureColor.WHITE))
+
+    def test_king_cannot_move_into_attack(self):
+        with self.assertRaises(IllegalMoveException):
+            self.board.perform_action(self.white_king, KingMoveAbility(), BoardPosition(3, 0))
+        self.assertEqual(self.white_king.position, BoardPosition(4, 0))
+        self.board.perform_action(self.white_king, KingMoveAbility(), BoardPosition(5, 0))
+
+    def test_pinned_figure_cannot_leave_line(self):
+        with self.assertRaises(IllegalMoveException):
+            self.board.perform_action(self.white_rook, RookMoveAbility(), BoardPosition(5, 1))
+        self.assertIs(self.board.get_figure_by_position(BoardPosition(4, 1)), self.white_rook)
+        self.board.perform_action(self.white_rook, RookMoveAbility(), BoardPosition(4, 7))
+        self.assertTrue(self.black_rook.is_dead)
+
+    def test_legal_moves_skip_pinned_moves(self):
+        targets = {to_pos for _, _, to_pos in self.board.legal_moves(self.white_rook)}
+        self.assertEqual(targets, {BoardPosition(4, y) for y in range(2, 8)})
+
+    def test_legal_moves_keep_figures_order(self):
+        # проверка на шах делает пробные взятия; перебор board.figures не должен от них сбиваться
+        board = board_from_fen("4k3/8/8/8/8/8/8/nRB1K3")
+        figures = list(board.figures)
+        visited = []
+        for figure in board.figures:
+            list(board.legal_moves(figure))
+            visited.append(figure)
+        self.assertEqual(visited, figures)
+        self.assertEqual(board.figures, figures)
+
+    def test_attack_map_follows_moves(self):
+        self.assertTrue(self.board.attack_map(FigureColor.BLACK) >> BoardPosition(3, 0).index & 1)
+        self.board.move_figure(self.black_rook2, BoardPosition(2, 7))
+        attack_map = self.board.attack_map(FigureColor.BLACK)
+        self.assertFalse(attack_map >> BoardPosition(3, 0).index & 1)
+        self.assertTrue(attack_map >> BoardPosition(2, 0).index & 1)
+
+    def test_pawn_and_knight_attacks(self):
+        pawn = BoardFigure(figure=PawnFigure(), position=BoardPosition(3, 2), color=FigureColor.BLACK)
+        knight = BoardFigure(figure=KnightFigure(), position=BoardPosition(6, 3), color=FigureColor.BLACK)
+        board = ChessBoard(figures=[pawn, knight])
+        self.assertTrue(board.is_square_attacked(BoardPosition(4, 1).index, FigureColor.BLACK))
+        self.assertFalse(board.is_square_attacked(BoardPosition(4, 3).index, FigureColor.BLACK))
+        self.assertTrue(board.is_square_attacked(BoardPosition(5, 1).index, FigureColor.BLACK))
@@ -18,6 +18,7 @@ from game_logic.figure_abilities import (
     KingMoveAbility,
     PawnMoveAbility,
 )
+from game_logic.registry import FIGURES, ABILITIES
 from game_logic.figures import (
     RookFigure,
     BishopFigure,
@@ -36,6 +37,24 @@ class TestBoardPosition(unittest.TestCase):
         with self.assertRaises(OutOfBoardException):
             pos = BoardPosition(0, 8)
 
+    def test_out_of_board_index(self):
+        with self.assertRaises(OutOfBoardException):
+            pos = BoardPosition.from_index(64)
+
+    def test_interned(self):
+        self.assertIs(BoardPosition(3, 5), BoardPosition.of(3, 5))
+        self.assertIs(BoardPosition(3, 5), BoardPosition.from_index(43))
+        self.assertEqual(BoardPosition(3, 5).index, 43)
+
+    def test_hashable(self):
+        positions = {BoardPosition(1, 1): "b2"}
+        self.assertEqual(positions[BoardPosition.of(1, 1)], "b2")
+
+    def test_immutable(self):
+        pos = BoardPosition(0, 0)
+        with self.assertRaises(AttributeError):
+            pos.x = 1
+
 
 class TestBoardFigure(unittest.TestCase):
     def test_create_with_rook(self):
@@ -45,6 +64,19 @@ class TestBoardFigure(unittest.TestCase):
         )
         self.assertEqual(board_figure.figure, rook)
 
+    def test_slotted_with_square_index(self):
+        board_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(2, 3), color=FigureColor.WHITE
+        )
+        self.assertEqual(board_figure.square, 26)
+        self.assertIs(board_figure.position, BoardPosition(2, 3))
+        with self.assertRaises(AttributeError):
+            board_figure.__dict__
+
+    def test_figures_are_flyweights(self):
+        self.assertIs(RookFigure(), RookFigure())
+        self.assertIsNot(RookFigure(), BishopFigure())
+
 
 class TestChessBoard(unittest.TestCase):
     def test_create(self):
@@ -337,11 +369,226 @@ class TestChessBoard(unittest.TestCase):
         )
         self.assertEqual(board_queen_figure.position, BoardPosition(4, 0))
 
+    def test_squares_updated_after_capture(self):
+        rook_figure = RookFigure()
+        board_rook_figure1 = BoardFigure(
+            figure=rook_figure, position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        board_rook_figure2 = BoardFigure(
+            figure=rook_figure, position=BoardPosition(0, 3), color=FigureColor.BLACK
+        )
+        board = ChessBoard(figures=[board_rook_figure1, board_rook_figure2])
+        board.perform_action(
+            figure=board_rook_figure1,
+            ability=RookMoveAbility(),
+            to_position=BoardPosition(0, 3),
+        )
+        self.assertIsNone(board.get_figure_by_position(BoardPosition(0, 0)))
+        self.assertEqual(board.get_figure_by_position(BoardPosition(0, 3)), board_rook_figure1)
+        board.perform_action(
+            figure=board_rook_figure1,
+            ability=RookMoveAbility(),
+            to_position=BoardPosition(0, 0),
+        )
+        self.assertEqual(board_rook_figure1.position, BoardPosition(0, 0))
+
+    def test_bishop_moving_over_figure_on_back_diagonal(self):
+        rook_figure = RookFigure()
+        bishop_figure = BishopFigure()
+        board_rook_figure = BoardFigure(
+            figure=rook_figure, position=BoardPosition(3, 3), color=FigureColor.BLACK
+        )
+        board_bishop_figure = BoardFigure(
+            figure=bishop_figure, position=BoardPosition(4, 2), color=FigureColor.WHITE
+        )
+        board = ChessBoard(figures=[board_rook_figure, board_bishop_figure])
+        with self.assertRaises(IllegalMoveException):
+            board.perform_action(
+                figure=board_bishop_figure,
+                ability=BishopMoveAbility(),
+                to_position=BoardPosition(2, 4),
+            )
+
+    def test_queen_moves(self):
+        board_queen_figure = BoardFigure(
+            figure=QueenFigure(), position=BoardPosition(3, 3), color=FigureColor.WHITE
+        )
+        board_rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(5, 5), color=FigureColor.BLACK
+        )
+        board_knight_figure = BoardFigure(
+            figure=KnightFigure(), position=BoardPosition(3, 5), color=FigureColor.WHITE
+        )
+        board = ChessBoard(figures=[board_queen_figure, board_rook_figure, board_knight_figure])
+        queen_move_ability = QueenMoveAbility()
+        self.assertTrue(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(0, 0)))
+        self.assertTrue(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(7, 3)))
+        self.assertTrue(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(5, 5)))
+        self.assertFalse(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(6, 6)))
+        self.assertFalse(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(3, 5)))
+        self.assertFalse(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(3, 6)))
+        self.assertFalse(queen_move_ability.is_can_perform(board, board_queen_figure, BoardPosition(4, 5)))
+        self.assertEqual(len(list(board.legal_moves(board_queen_figure))), 22)
+
+    def test_king_moves_one_square(self):
+        board_king_figure = BoardFigure(
+            figure=KingFigure(), position=BoardPosition(4, 0), color=FigureColor.WHITE
+        )
+        board = ChessBoard(figures=[board_king_figure])
+        king_move_ability = KingMoveAbility()
+        with self.assertRaises(IllegalMoveException):
+            board.perform_action(figure=board_king_figure, ability=king_move_ability, to_position=BoardPosition(4, 2))
+        board.perform_action(figure=board_king_figure, ability=king_move_ability, to_position=BoardPosition(5, 1))
+        self.assertEqual(board_king_figure.position, BoardPosition(5, 1))
+
+    def test_pawn_moves(self):
+        board_pawn_figure = BoardFigure(
+            figure=PawnFigure(), position=BoardPosition(3, 1), color=FigureColor.WHITE
+        )
+        board_knight_figure = BoardFigure(
+            figure=KnightFigure(), position=BoardPosition(4, 2), color=FigureColor.BLACK
+        )
+        board_bishop_figure = BoardFigure(
+            figure=BishopFigure(), position=BoardPosition(2, 2), color=FigureColor.WHITE
+        )
+        board = ChessBoard(figures=[board_pawn_figure, board_knight_figure, board_bishop_figure])
+        pawn_move_ability = PawnMoveAbility()
+        self.assertTrue(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(3, 2)))
+        self.assertTrue(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(3, 3)))
+        self.assertTrue(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(4, 2)))
+        self.assertFalse(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(2, 2)))
+        self.assertFalse(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(3, 0)))
+        self.assertFalse(pawn_move_ability.is_can_perform(board, board_pawn_figure, BoardPosition(3, 4)))
+        board.move_figure(board_knight_figure, BoardPosition(3, 2))
+        self.assertEqual(len(list(board.legal_moves(board_pawn_figure))), 0)
+
+    def test_pawn_promotion_is_undone(self):
+        board_pawn_figure = BoardFigure(
+            figure=PawnFigure(), position=BoardPosition(0, 1), color=FigureColor.BLACK
+        )
+        board = ChessBoard(figures=[board_pawn_figure])
+        snapshot = board.snapshot()
+        board.perform_action(figure=board_pawn_figure, ability=PawnMoveAbility(), to_position=BoardPosition(0, 0))
+        self.assertIsInstance(board_pawn_figure.figure, QueenFigure)
+        self.assertEqual(board.get_figures_mask(QueenFigure, FigureColor.BLACK), 1)
+        board.unmove_figure(board_pawn_figure, BoardPosition(0, 1), None)
+        self.assertIsInstance(board_pawn_figure.figure, PawnFigure)
+        self.assertEqual(board.snapshot(), snapshot)
+
+
+class TestLegalMoves(unittest.TestCase):
+    def test_rook_moves_stop_on_figures(self):
+        board_rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        board_knight_figure = BoardFigure(
+            figure=KnightFigure(), position=BoardPosition(0, 2), color=FigureColor.WHITE
+        )
+        board_bishop_figure = BoardFigure(
+            figure=BishopFigure(), position=BoardPosition(2, 0), color=FigureColor.BLACK
+        )
+        board = ChessBoard(figures=[board_rook_figure, board_knight_figure, board_bishop_figure])
+        moves = list(board.legal_moves(board_rook_figure))
+        self.assertEqual(
+            moves,
+            [
+                (board_rook_figure, RookMoveAbility, BoardPosition(1, 0)),
+                (board_rook_figure, RookMoveAbility, BoardPosition(2, 0)),
+                (board_rook_figure, RookMoveAbility, BoardPosition(0, 1)),
+            ],
+        )
+
+    def test_all_legal_moves_of_color(self):
+        board_rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        board_knight_figure = BoardFigure(
+            figure=KnightFigure(), position=BoardPosition(0, 2), color=FigureColor.WHITE
+        )
+        board_bishop_figure = BoardFigure(
+            figure=BishopFigure(), position=BoardPosition(2, 0), color=FigureColor.BLACK
+        )
+        board = ChessBoard(figures=[board_rook_figure, board_knight_figure, board_bishop_figure])
+        self.assertEqual(len(list(board.all_legal_moves(FigureColor.WHITE))), 3 + 4)
+        self.assertEqual(len(list(board.all_legal_moves(FigureColor.BLACK))), 7)
+
+    def test_moves_are_lazy(self):
+        board_rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        board = ChessBoard(figures=[board_rook_figure])
+        first_move = next(board.all_legal_moves(FigureColor.WHITE))
+        self.assertEqual(first_move, (board_rook_figure, RookMoveAbility, BoardPosition(1, 0)))
+
+
+class TestBoardSnapshot(unittest.TestCase):
+    def create_board(self):
+        board_rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        board_knight_figure = BoardFigure(
+            figure=KnightFigure(), position=BoardPosition(4, 7), color=FigureColor.BLACK
+        )
+        return ChessBoard(figures=[board_rook_figure, board_knight_figure])
+
+    def test_snapshot_round_trip(self):
+        board = self.create_board()
+        snapshot = board.snapshot()
+        self.assertEqual(len(snapshot), 64)
+        restored = ChessBoard.from_snapshot(snapshot)
+        self.assertEqual(restored.snapshot(), snapshot)
+        knight = restored.get_figure_by_position(BoardPosition(4, 7))
+        self.assertIsInstance(knight.figure, KnightFigure)
+        self.assertEqual(knight.color, FigureColor.BLACK)
+
+    def test_clone_is_independent(self):
+        board = self.create_board()
+        clone = board.clone()
+        rook = clone.get_figure_by_position(BoardPosition(0, 0))
+        clone.perform_action(figure=rook, ability=RookMoveAbility(), to_position=BoardPosition(0, 5))
+        self.assertIsNone(clone.get_figure_by_position(BoardPosition(0, 0)))
+        self.assertIsNotNone(board.get_figure_by_position(BoardPosition(0, 0)))
+
+    def test_clone_copies_state(self):
+        board = self.create_board()
+        clone = board.clone()
+        self.assertEqual(clone.snapshot(), board.snapshot())
+        self.assertEqual(clone.zobrist_key, board.zobrist_key)
+        self.assertEqual(clone.figure_masks, board.figure_masks)
+        rook = board.get_figure_by_position(BoardPosition(0, 0))
+        self.assertIsNot(clone.get_figure_by_position(BoardPosition(0, 0)), rook)
+
+    def test_game_snapshot(self):
+        game = ChessGame(board=self.create_board(), time_units=150)
+        game.black_time = 90
+        game.side_to_move = FigureColor.BLACK
+        snapshot = game.snapshot()
+        self.assertLess(len(snapshot), 100)
+        restored = ChessGame.from_snapshot(snapshot)
+        self.assertEqual((restored.white_time, restored.black_time), (150, 90))
+        self.assertEqual(restored.side_to_move, FigureColor.BLACK)
+        self.assertEqual(restored.board.snapshot(), game.board.snapshot())
+
 
 class TestRookAbilities(unittest.TestCase):
     def test_create(self):
         ability = RookMoveAbility()
 
+    def test_singleton(self):
+        self.assertIs(RookMoveAbility(), RookMoveAbility())
+        self.assertIsNot(RookMoveAbility(), BishopMoveAbility())
+
+
+class TestRegistry(unittest.TestCase):
+    def test_ids(self):
+        self.assertEqual(FIGURES.get(RookFigure.type_id), RookFigure)
+        self.assertEqual(ABILITIES.get(KnightMoveAbility.type_id), KnightMoveAbility)
+        self.assertEqual(len({figure.type_id for figure in FIGURES.types}), len(FIGURES.types))
+
+    def test_abilities_mask(self):
+        self.assertTrue(QueenFigure.abilities_mask & QueenMoveAbility.ability_bit)
+        self.assertFalse(QueenFigure.abilities_mask & RookMoveAbility.ability_bit)
+
 
 class TestChessGame(unittest.TestCase):
     def test_create_with_one_rook(self):
@@ -354,3 +601,71 @@ class TestChessGame(unittest.TestCase):
 
         self.assertEqual(game.board, board)
         self.assertEqual(game.board.figures[0], rook_figure)
+
+    def test_perform_move_moves_figure_and_spends_time(self):
+        rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        game = ChessGame(board=ChessBoard(figures=[rook_figure]), time_units=150)
+        game.perform_move(rook_figure, RookMoveAbility(), BoardPosition(0, 4), time_units=10)
+        self.assertEqual(rook_figure.position, BoardPosition(0, 4))
+        self.assertEqual((game.white_time, game.black_time), (140, 150))
+        self.assertEqual(game.side_to_move, FigureColor.BLACK)
+
+    def test_make_and_unmake_capture(self):
+        rook_figure1 = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        rook_figure2 = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 5), color=FigureColor.BLACK
+        )
+        board = ChessBoard(figures=[rook_figure1, rook_figure2])
+        game = ChessGame(board=board, time_units=150)
+        snapshot = game.snapshot()
+        record = game.make_move(rook_figure1, RookMoveAbility(), BoardPosition(0, 5), time_units=7)
+        self.assertIs(record.captured, rook_figure2)
+        self.assertTrue(rook_figure2.is_dead)
+        self.assertEqual((board.figures, board.captured), ([rook_figure1], [rook_figure2]))
+        game.unmake_move(record)
+        self.assertEqual(game.snapshot(), snapshot)
+        self.assertFalse(rook_figure2.is_dead)
+        self.assertEqual((len(board.figures), board.captured), (2, []))
+        self.assertIs(board.get_figure_by_position(BoardPosition(0, 5)), rook_figure2)
+        self.assertEqual(board.occupied, (1 << 0) | (1 << 40))
+
+    def test_illegal_move_keeps_clocks(self):
+        rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        game = ChessGame(board=ChessBoard(figures=[rook_figure]), time_units=150)
+        with self.assertRaises(IllegalMoveException):
+            game.make_move(rook_figure, RookMoveAbility(), BoardPosition(1, 1), time_units=10)
+        self.assertEqual(game.white_time, 150)
+        self.assertEqual(game.undo_stack, [])
+
+    def test_position_key_is_incremental(self):
+        rook_figure1 = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        rook_figure2 = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 5), color=FigureColor.BLACK
+        )
+        game = ChessGame(board=ChessBoard(figures=[rook_figure1, rook_figure2]), time_units=150)
+        start_key = game.position_key
+        record = game.make_move(rook_figure1, RookMoveAbility(), BoardPosition(0, 5), time_units=7)
+        self.assertNotEqual(game.position_key, start_key)
+        recomputed = ChessGame.from_snapshot(game.snapshot())
+        self.assertEqual(game.position_key, recomputed.position_key)
+        game.unmake_move(record)
+        self.assertEqual(game.position_key, start_key)
+
+    def test_position_key_depends_on_side_and_clock(self):
+        rook_figure = BoardFigure(
+            figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE
+        )
+        game = ChessGame(board=ChessBoard(figures=[rook_figure]), time_units=150)
+        start_key = game.position_key
+        game.side_to_move = FigureColor.BLACK
+        black_key = game.position_key
+        game.black_time -= 1
+        self.assertEqual(len({start_key, black_key, game.position_key}), 3)
@@ -0,0 +1,79 @@
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.board_setup import game_from_fen
+from game_logic.engine import Engine, TranspositionTable, MATE_SCORE
+from game_logic.figure_abilities import RookMoveAbility
+from game_logic.figures import RookFigure, BishopFigure, KnightFigure
+
+
+def create_game(time_units: int = 100) -> ChessGame:
+    figures = [
+        BoardFigure(figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE),
+        BoardFigure(figure=KnightFigure(), position=BoardPosition(1, 0), color=FigureColor.WHITE),
+        BoardFigure(figure=RookFigure(), position=BoardPosition(0, 7), color=FigureColor.BLACK),
+        BoardFigure(figure=BishopFigure(), position=BoardPosition(5, 3), color=FigureColor.BLACK),
+    ]
+    return ChessGame(board=ChessBoard(figures=figures), time_units=time_units)
+
+
+class TestEngine(unittest.TestCase):
+    def test_finds_capture(self):
+        game = create_game()
+        result = Engine().search(game, max_depth=3)
+        self.assertEqual(result.best_move.ability, RookMoveAbility)
+        self.assertEqual(result.best_move.to_position, BoardPosition(0, 7))
+        self.assertEqual(result.depth, 3)
+        self.assertGreater(result.nodes_per_second, 0)
+
+    def test_search_keeps_game_unchanged(self):
+        game = create_game()
+        snapshot = game.snapshot()
+        Engine().search(game, max_depth=3)
+        self.assertEqual(game.snapshot(), snapshot)
+        self.assertEqual(game.undo_stack, [])
+
+    def test_node_budget(self):
+        result = Engine().search(create_game(), max_depth=30, max_nodes=500)
+        self.assertLess(result.depth, 30)
+        self.assertLessEqual(result.nodes, 501)
+        self.assertIsNotNone(result.best_move)
+
+    def test_avoids_flag_fall(self):
+        def time_cost(figure, ability, to_position):
+            return 50 if to_position == BoardPosition(0, 7) else 1
+
+        result = Engine(time_cost=time_cost).search(create_game(time_units=20), max_depth=2)
+        self.assertNotEqual(result.best_move.to_position, BoardPosition(0, 7))
+        self.assertEqual(result.best_move.time_units, 1)
+
+    def test_mated_and_stalemated_root(self):
+        mated = Engine().search(game_from_fen("R5k1/5ppp/8/8/8/8/5PPP/6K1 b", 100), max_depth=3)
+        self.assertEqual((mated.best_move, mated.score), (None, -MATE_SCORE))
+        stalemate = Engine().search(game_from_fen("k7/8/1Q6/8/8/8/8/7K b", 100), max_depth=3)
+        self.assertEqual((stalemate.best_move, stalemate.score), (None, 0))
+
+    def test_mate_distance_survives_transpositions(self):
+        engine = Engine()
+        # позиция после 1. Лb7 Крg8 (по единице времени на ход): мат в один ход
+        mate_in_one = engine.search(game_from_fen("6k1/1R6/8/8/8/8/8/R5K1 w", 99), max_depth=4)
+        self.assertEqual(mate_in_one.score, MATE_SCORE - 1)
+        # та же позиция берётся из таблицы на втором полуходе, мат - на третьем
+        result = engine.search(game_from_fen("7k/8/8/8/8/8/1R6/R5K1 w", 100), max_depth=4)
+        self.assertEqual(result.score, MATE_SCORE - 3)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_replacement_policy(self):
+        tt = TranspositionTable(size=4)
+        tt.store(1, 5, 10, 0, None)
+        tt.store(5, 2, 20, 0, None)
+        self.assertEqual(tt.probe(1)[2], 10)
+        self.assertIsNone(tt.probe(5))
+        tt.new_search()
+        tt.store(5, 2, 20, 0, None)
+        self.assertEqual(tt.probe(5)[2], 20)
+        self.assertEqual((tt.hits, tt.probes), (2, 3))
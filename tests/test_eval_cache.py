@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from game_logic.engine import Engine
+from game_logic.eval_cache import EvaluationCache, CachedAnalysis, cache_key
+from game_logic.time_control import TimeControl
+from tests.test_engine import create_game
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = EvaluationCache(max_entries=2)
+        cache.put((1, 0, 0, 0, 0), CachedAnalysis(10, 1))
+        cache.put((2, 0, 0, 0, 0), CachedAnalysis(20, 1))
+        self.assertEqual(cache.get((1, 0, 0, 0, 0)).score, 10)
+        cache.put((3, 0, 0, 0, 0), CachedAnalysis(30, 1))
+        self.assertIsNone(cache.get((2, 0, 0, 0, 0)))
+        self.assertEqual(cache.get((1, 0, 0, 0, 0)).score, 10)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats(), (2, 3))
+
+    def test_key_includes_clocks(self):
+        game = create_game(time_units=100)
+        key = cache_key(game)
+        game.black_time -= 1
+        self.assertNotEqual(cache_key(game), key)
+
+    def test_key_includes_time_control(self):
+        game = create_game(time_units=100)
+        key = cache_key(game)
+        game.time_control = TimeControl(increment=2)
+        self.assertNotEqual(cache_key(game), key)
+
+    def test_disk_store_survives_restart(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        cache = EvaluationCache(path=path)
+        cache.put(((1 << 64) - 1, 5, 6, 0, 0), CachedAnalysis(-7, 3, 1, 2, 0))
+        cache.close()
+        cache = EvaluationCache(path=path)
+        self.addCleanup(cache.close)
+        self.assertEqual(cache.get(((1 << 64) - 1, 5, 6, 0, 0)), CachedAnalysis(-7, 3, 1, 2, 0))
+
+    def test_disk_writes_are_batched(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        cache = EvaluationCache(path=path, flush_every=2)
+        self.addCleanup(cache.close)
+        reader = sqlite3.connect(path)
+        self.addCleanup(reader.close)
+        count = "SELECT COUNT(*) FROM analysis_v2"
+        cache.put((1, 0, 0, 0, 0), CachedAnalysis(10, 1))
+        self.assertEqual(reader.execute(count).fetchone(), (0,))
+        cache.put((2, 0, 0, 0, 0), CachedAnalysis(20, 1))
+        self.assertEqual(reader.execute(count).fetchone(), (2,))
+        cache.put((3, 0, 0, 0, 0), CachedAnalysis(30, 1))
+        cache.flush()
+        self.assertEqual(reader.execute(count).fetchone(), (3,))
+
+    def test_engine_reuses_cached_result(self):
+        cache = EvaluationCache()
+        first = Engine(cache=cache).search(create_game(), max_depth=3)
+        second = Engine(cache=cache).search(create_game(), max_depth=2)
+        self.assertEqual(second.nodes, 0)
+        self.assertEqual(second.depth, 3)
+        self.assertEqual(second.best_move.to_position, first.best_move.to_position)
+        self.assertEqual(second.score, first.score)
@@ -0,0 +1,72 @@
+import io
+import os
+import tempfile
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_game import ChessGame
+from game_logic.figure_abilities import RookMoveAbility, BishopMoveAbility, KnightMoveAbility
+from game_logic.game_record import (
+    GameRecordFile,
+    GameRecordWriter,
+    RecordedMove,
+    decode_move,
+    encode_move,
+    moves_from_game,
+    read_games,
+)
+from tests.test_engine import create_game
+
+
+def create_played_game() -> tuple[bytes, ChessGame]:
+    """Снапшот начальной позиции create_game и игра после трёх ходов"""
+    game = create_game()
+    snapshot = game.snapshot()
+    board = game.board
+    game.make_move(
+        board.get_figure_by_position(BoardPosition(0, 0)), RookMoveAbility(), BoardPosition(0, 7), 12
+    )
+    game.make_move(
+        board.get_figure_by_position(BoardPosition(5, 3)), BishopMoveAbility(), BoardPosition(7, 5), 3
+    )
+    game.make_move(
+        board.get_figure_by_position(BoardPosition(1, 0)), KnightMoveAbility(), BoardPosition(2, 2), 5
+    )
+    return snapshot, game
+
+
+class TestGameRecord(unittest.TestCase):
+    def test_move_encoding(self):
+        value = encode_move(63, 5, KnightMoveAbility, 1000)
+        self.assertEqual(decode_move(value), RecordedMove(63, 5, KnightMoveAbility, 1000))
+        with self.assertRaises(ValueError):
+            encode_move(0, 1, RookMoveAbility, 1 << 16)
+
+    def test_stream_round_trip(self):
+        snapshot, game = create_played_game()
+        stream = io.BytesIO()
+        writer = GameRecordWriter(stream)
+        writer.write_chess_game(snapshot, game)
+        writer.write_game(snapshot, [])
+        stream.seek(0)
+        games = list(read_games(stream))
+        self.assertEqual(len(games), 2)
+        offset, record = games[0]
+        self.assertEqual(offset, 0)
+        self.assertEqual(record.snapshot, snapshot)
+        self.assertEqual(list(record.iter_moves()), list(moves_from_game(game)))
+        self.assertEqual(len(games[1][1].moves), 0)
+
+    def test_mmap_random_access(self):
+        snapshot, game = create_played_game()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with open(path, "wb") as file:
+            writer = GameRecordWriter(file)
+            offsets = [writer.write_game(snapshot, []), writer.write_chess_game(snapshot, game)]
+        with GameRecordFile(path) as records:
+            self.assertEqual(list(records.offsets()), offsets)
+            record = records.game_at(offsets[1])
+            self.assertEqual(len(record.moves), 3)
+            self.assertEqual(next(record.iter_moves()), RecordedMove(0, 56, RookMoveAbility, 12))
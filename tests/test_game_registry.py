@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.constants import FigureColor
+from game_logic.exceptions import GameNotFoundException, IllegalMoveException, WrongAbilityException
+from game_logic.figures import RookFigure
+from game_logic.game_registry import GameRegistry
+
+
+def create_board() -> ChessBoard:
+    return ChessBoard(figures=[
+        BoardFigure(figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE),
+        BoardFigure(figure=RookFigure(), position=BoardPosition(7, 7), color=FigureColor.BLACK),
+    ])
+
+
+class TestGameRegistry(unittest.IsolatedAsyncioTestCase):
+    async def test_create_and_get(self):
+        registry = GameRegistry(shards=4)
+        sessions = [registry.create(create_board(), 100) for _ in range(10)]
+        self.assertEqual(len(registry), 10)
+        for session in sessions:
+            self.assertIs(registry.get(session.game_id), session)
+        registry.remove(sessions[0].game_id)
+        with self.assertRaises(GameNotFoundException):
+            registry.get(sessions[0].game_id)
+
+    async def test_perform_move(self):
+        registry = GameRegistry()
+        session = registry.create(create_board(), 100)
+        waiter = asyncio.create_task(session.wait_changed(session.version))
+        await registry.perform_move(
+            session.game_id, BoardPosition(0, 0), "RookMoveAbility", BoardPosition(0, 5), 10
+        )
+        self.assertEqual(await waiter, 1)
+        self.assertIsNotNone(session.game.board.get_figure_by_position(BoardPosition(0, 5)))
+        self.assertEqual(session.game.white_time, 90)
+
+    async def test_wrong_moves(self):
+        registry = GameRegistry()
+        session = registry.create(create_board(), 100)
+        with self.assertRaises(WrongAbilityException):
+            await registry.perform_move(
+                session.game_id, BoardPosition(0, 0), "BishopMoveAbility", BoardPosition(1, 1), 10
+            )
+        with self.assertRaises(IllegalMoveException):
+            await registry.perform_move(
+                session.game_id, BoardPosition(3, 3), "RookMoveAbility", BoardPosition(3, 4), 10
+            )
+        self.assertEqual(session.version, 0)
+
+    async def test_evict_idle_and_finished_games(self):
+        registry = GameRegistry(shards=4)
+        idle = registry.create(create_board(), 100)
+        finished = registry.create(create_board(), 100)
+        active = registry.create(create_board(), 100)
+        finished.game.flag_fall(FigureColor.WHITE)
+        now = active.last_active
+        idle.last_active = now - 100
+        finished.last_active = now - 20
+        waiter = asyncio.create_task(idle.wait_changed(idle.version))
+        self.assertEqual(registry.evict(max_idle=50, finished_ttl=10, now=now), 2)
+        await waiter
+        self.assertTrue(idle.closed)
+        self.assertIs(registry.get(active.game_id), active)
+        with self.assertRaises(GameNotFoundException):
+            registry.get(finished.game_id)
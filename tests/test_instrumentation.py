@@ -0,0 +1,52 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from game_logic import instrumentation
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard
+from game_logic.figure_abilities import RookMoveAbility, KnightMoveAbility
+from tests.test_engine import create_game
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.metrics.reset()
+
+    def test_disabled_by_default(self):
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertNotIn("is_can_perform", RookMoveAbility.__dict__)
+
+    def test_counts_calls(self):
+        original = ChessBoard.get_figure_by_position
+        instrumentation.enable()
+        game = create_game()
+        rook = game.board.get_figure_by_position(BoardPosition(0, 0))
+        game.perform_move(rook, RookMoveAbility(), BoardPosition(0, 7), 1)
+        latency = instrumentation.metrics.latency
+        self.assertEqual(latency["ChessGame.perform_move"].count, 1)
+        self.assertEqual(latency["RookMoveAbility.is_can_perform"].count, 1)
+        self.assertEqual(latency["KnightMoveAbility.is_can_perform"].count, 0)
+        instrumentation.disable()
+        self.assertIs(ChessBoard.get_figure_by_position, original)
+        self.assertNotIn("is_can_perform", KnightMoveAbility.__dict__)
+
+    def test_prometheus_export(self):
+        instrumentation.enable()
+        instrumentation.metrics.register_cache("test", lambda: (3, 4))
+        self.addCleanup(instrumentation.metrics.cache_sources.pop, "test")
+        create_game().board.get_figure_by_position(BoardPosition(0, 0))
+        text = instrumentation.metrics.export_prometheus()
+        self.assertIn('omegachess_calls_total{function="ChessBoard.get_figure_by_position"} 1', text)
+        self.assertIn('omegachess_latency_seconds_bucket{function="ChessBoard.get_figure_by_position",le="+Inf"} 1', text)
+        self.assertIn('omegachess_cache_hit_ratio{cache="test"} 0.750000', text)
+
+    def test_profile_replay(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with instrumentation.profile_replay(path):
+            create_game()
+        self.assertGreater(len(pstats.Stats(path).stats), 0)
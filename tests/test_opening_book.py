@@ -0,0 +1,40 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.figure_abilities import RookMoveAbility, KnightMoveAbility
+from game_logic.game_record import GameRecordWriter, RecordedMove
+from game_logic.opening_book import OpeningBook, build_book
+from tests.test_engine import create_game
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.games_path = os.path.join(directory.name, "games.bin")
+        self.book_path = os.path.join(directory.name, "book.bin")
+        snapshot = create_game().snapshot()
+        rook_move = RecordedMove(BoardPosition(0, 0).index, BoardPosition(0, 5).index, RookMoveAbility, 3)
+        knight_move = RecordedMove(BoardPosition(1, 0).index, BoardPosition(2, 2).index, KnightMoveAbility, 1)
+        with open(self.games_path, "wb") as file:
+            writer = GameRecordWriter(file)
+            writer.write_game(snapshot, [rook_move])
+            writer.write_game(snapshot, [rook_move])
+            writer.write_game(snapshot, [knight_move])
+
+    def test_build_and_lookup(self):
+        self.assertEqual(build_book(self.games_path, self.book_path), 2)
+        with OpeningBook(self.book_path) as book:
+            moves = book.lookup_game(create_game())
+            self.assertEqual([(move.ability, move.weight) for move in moves], [(RookMoveAbility, 2), (KnightMoveAbility, 1)])
+            self.assertEqual(moves[0].to_square, BoardPosition(0, 5).index)
+            self.assertEqual(book.lookup(12345), [])
+            self.assertIn(book.choose(create_game(), random.Random(0)), moves)
+
+    def test_clock_does_not_change_book_key(self):
+        build_book(self.games_path, self.book_path)
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(len(book.lookup_game(create_game(time_units=7))), 2)
@@ -0,0 +1,53 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic.board_position import BoardPosition
+from game_logic.board_setup import game_from_fen
+from game_logic.engine import Engine, MATE_SCORE
+from game_logic.parallel import analyse_batch, parallel_search
+from tests.test_engine import create_game
+
+
+def expensive_move(figure, ability, to_position) -> int:
+    return 15
+
+
+class TestParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_parallel_search_matches_engine(self):
+        game = create_game()
+        result = parallel_search(game, max_depth=3, executor=self.executor)
+        expected = Engine().search(create_game(), max_depth=3)
+        self.assertEqual(result.best_move.to_position, BoardPosition(0, 7))
+        self.assertEqual(result.score, expected.score)
+        self.assertEqual(game.undo_stack, [])
+
+    def test_parallel_search_uses_time_cost(self):
+        result = parallel_search(
+            create_game(time_units=20), max_depth=3, executor=self.executor, time_cost=expensive_move
+        )
+        expected = Engine(time_cost=expensive_move).search(create_game(time_units=20), max_depth=3)
+        self.assertEqual(result.score, expected.score)
+        self.assertEqual(result.best_move.time_units, 15)
+
+    def test_parallel_search_finds_mate(self):
+        fen = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w"
+        result = parallel_search(game_from_fen(fen, 100), max_depth=3, executor=self.executor)
+        expected = Engine().search(game_from_fen(fen, 100), max_depth=3)
+        self.assertEqual(result.best_move.to_position, BoardPosition(0, 7))
+        self.assertEqual(result.score, MATE_SCORE - 1)
+        self.assertEqual(result.score, expected.score)
+
+    def test_analyse_batch_streams_all_positions(self):
+        snapshots = [create_game(time_units).snapshot() for time_units in (50, 60, 70)]
+        results = list(analyse_batch(snapshots, max_depth=2, executor=self.executor))
+        self.assertEqual(sorted(result.index for result in results), [0, 1, 2])
+        for result in results:
+            self.assertEqual(result.to_square, BoardPosition(0, 7).index)
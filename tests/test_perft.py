@@ -0,0 +1,67 @@
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard
+from game_logic.constants import FigureColor
+from game_logic.exceptions import IllegalMoveException
+from game_logic.perft import perft, divide
+from game_logic.board_setup import board_from_fen, standard_board
+from benchmarks.bench_moves import PERFT_POSITIONS, middlegame_board, minor_pieces_board
+
+
+def brute_force_perft(board: ChessBoard, color: FigureColor, depth: int) -> int:
+    """Perft через perform на каждую клетку - медленно, но не зависит от масок ходов"""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for figure in [figure for figure in board.figures if not figure.is_dead and figure.color == color]:
+        for ability_class in figure.figure.abilities:
+            for square in range(64):
+                to_position = BoardPosition.from_index(square)
+                from_position = figure.position
+                captured = board.get_figure_by_position(to_position)
+                if to_position == from_position:
+                    continue
+                try:
+                    ability_class().perform(board, figure, to_position)
+                except IllegalMoveException:
+                    continue
+                nodes += brute_force_perft(board, color.opposite, depth - 1)
+                board.unmove_figure(figure, from_position, captured)
+    return nodes
+
+
+class TestPerft(unittest.TestCase):
+    def test_matches_brute_force(self):
+        board = minor_pieces_board()
+        snapshot = board.snapshot()
+        for depth in (1, 2):
+            self.assertEqual(perft(board, FigureColor.WHITE, depth), brute_force_perft(board, FigureColor.WHITE, depth))
+        self.assertEqual(board.snapshot(), snapshot)
+
+    def test_middlegame_matches_brute_force(self):
+        board = middlegame_board()
+        for depth in (1, 2):
+            self.assertEqual(perft(board, FigureColor.WHITE, depth), brute_force_perft(board, FigureColor.WHITE, depth))
+
+    def test_benchmark_reference_counts(self):
+        for name, build_board, _, expected in PERFT_POSITIONS:
+            with self.subTest(name):
+                board = build_board()
+                self.assertEqual([perft(board, FigureColor.WHITE, depth) for depth in (1, 2)], expected[:2])
+
+    def test_divide_sums_to_perft(self):
+        board = minor_pieces_board()
+        self.assertEqual(sum(divide(board, FigureColor.BLACK, 2).values()), perft(board, FigureColor.BLACK, 2))
+
+    def test_start_position(self):
+        board = standard_board()
+        self.assertEqual([perft(board, FigureColor.WHITE, depth) for depth in (1, 2, 3)], [20, 400, 8902])
+
+    def test_promotions(self):
+        # превращение только в ферзя, поэтому на первом ходу 15, а не 24 хода
+        board = board_from_fen("n1n5/PPPk4/8/8/8/8/4Kppp/5N1N")
+        snapshot = board.snapshot()
+        self.assertEqual(perft(board, FigureColor.WHITE, 1), 15)
+        self.assertEqual(perft(board, FigureColor.WHITE, 2), brute_force_perft(board, FigureColor.WHITE, 2))
+        self.assertEqual(board.snapshot(), snapshot)
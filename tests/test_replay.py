@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic.figure_abilities import BishopMoveAbility, RookMoveAbility
+from game_logic.game_record import GameRecordWriter, RecordedMove
+from game_logic import replay
+from game_logic.replay import ReplayResult, ReplayStats, replay_chunk, replay_file
+from tests.test_game_record import create_played_game
+
+
+class TestReplay(unittest.TestCase):
+    def write_games(self) -> tuple[str, list[int]]:
+        snapshot, game = create_played_game()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with open(path, "wb") as file:
+            writer = GameRecordWriter(file)
+            offsets = [
+                writer.write_chess_game(snapshot, game),
+                # слон не ходит по вертикали
+                writer.write_game(snapshot, [
+                    RecordedMove(0, 56, RookMoveAbility, 12),
+                    RecordedMove(29, 37, BishopMoveAbility, 1),
+                ]),
+                # белые ходят два раза подряд
+                writer.write_game(snapshot, [
+                    RecordedMove(0, 8, RookMoveAbility, 1),
+                    RecordedMove(8, 16, RookMoveAbility, 1),
+                ]),
+                writer.write_game(snapshot, [RecordedMove(20, 21, RookMoveAbility, 1)]),
+                writer.write_chess_game(snapshot, game),
+            ]
+        return path, offsets
+
+    def test_first_illegal_move(self):
+        path, offsets = self.write_games()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = sorted(replay_file(path, chunk_size=2, executor=executor, workers=2))
+        self.assertEqual(results, [
+            ReplayResult(offsets[0], 3),
+            ReplayResult(offsets[1], 1, 1, "IllegalMoveException"),
+            ReplayResult(offsets[2], 1, 1, "WrongTurnException"),
+            ReplayResult(offsets[3], 0, 0, "EmptySquare"),
+            ReplayResult(offsets[4], 3),
+        ])
+        stats = ReplayStats()
+        for result in results:
+            stats.add(result)
+        self.assertEqual((stats.games, stats.moves, stats.illegal_games), (5, 8, 3))
+        self.assertGreater(stats.moves_per_second, 0)
+
+    def test_corrupt_record_is_reported_per_game(self):
+        path, offsets = self.write_games()
+        with open(path, "ab") as file:
+            # обрезанная запись в конце файла
+            file.write(b"\x00" * 5)
+        corrupt_offset = os.path.getsize(path) - 5
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = sorted(replay_file(path, chunk_size=4, executor=executor, workers=1))
+        self.assertEqual(len(results), len(offsets) + 1)
+        self.assertEqual(results[-1], ReplayResult(corrupt_offset, 0, 0, "BadRecordException"))
+        self.assertEqual(results[0], ReplayResult(offsets[0], 3))
+
+    def test_worker_sees_appended_games(self):
+        path, offsets = self.write_games()
+        self.addCleanup(lambda: replay._worker_files.pop(path).close())
+        self.assertEqual(replay_chunk(path, [offsets[0]]), [ReplayResult(offsets[0], 3)])
+        snapshot, game = create_played_game()
+        with open(path, "ab") as file:
+            offset = os.path.getsize(path)
+            GameRecordWriter(file).write_chess_game(snapshot, game)
+        self.assertEqual(replay_chunk(path, [offset]), [ReplayResult(offset, 3)])
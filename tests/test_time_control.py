@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+
+from game_logic.board_position import BoardPosition
+from game_logic.chess_board import ChessBoard, BoardFigure
+from game_logic.chess_game import ChessGame
+from game_logic.constants import FigureColor
+from game_logic.exceptions import TimeOverException, WrongTurnException
+from game_logic.figure_abilities import RookMoveAbility
+from game_logic.figures import RookFigure
+from game_logic.game_registry import GameRegistry
+from game_logic.time_control import FlagScheduler, MoveTimeLog, TimeControl, TimerWheel
+
+
+def create_game(time_units: int, time_control: TimeControl | None = None) -> ChessGame:
+    board = ChessBoard(figures=[
+        BoardFigure(figure=RookFigure(), position=BoardPosition(0, 0), color=FigureColor.WHITE),
+        BoardFigure(figure=RookFigure(), position=BoardPosition(7, 7), color=FigureColor.BLACK),
+    ])
+    return ChessGame(board=board, time_units=time_units, time_control=time_control)
+
+
+class TestTimeControl(unittest.TestCase):
+    def test_increment_and_delay(self):
+        game = create_game(100, TimeControl(increment=5, delay=3))
+        white = game.board.get_figure_by_position(BoardPosition(0, 0))
+        black = game.board.get_figure_by_position(BoardPosition(7, 7))
+        game.make_move(white, RookMoveAbility(), BoardPosition(0, 4), 10)
+        self.assertEqual(game.white_time, 100 - 7 + 5)
+        game.make_move(black, RookMoveAbility(), BoardPosition(7, 4), 2)
+        self.assertEqual(game.black_time, 105)
+        self.assertEqual(list(game.time_log[i] for i in range(len(game.time_log))), [7, 0])
+        game.unmake_move()
+        game.unmake_move()
+        self.assertEqual((game.white_time, game.black_time, len(game.time_log)), (100, 100, 0))
+
+    def test_wrong_turn(self):
+        game = create_game(100)
+        black = game.board.get_figure_by_position(BoardPosition(7, 7))
+        with self.assertRaises(WrongTurnException):
+            game.make_move(black, RookMoveAbility(), BoardPosition(7, 4), 1)
+        self.assertEqual(game.undo_stack, [])
+
+    def test_flag_fall_stops_game(self):
+        game = create_game(5, TimeControl(increment=10))
+        white = game.board.get_figure_by_position(BoardPosition(0, 0))
+        black = game.board.get_figure_by_position(BoardPosition(7, 7))
+        game.make_move(white, RookMoveAbility(), BoardPosition(0, 4), 6)
+        # после падения флага добавка не начисляется
+        self.assertEqual((game.white_time, game.flagged), (-1, FigureColor.WHITE))
+        with self.assertRaises(TimeOverException):
+            game.make_move(black, RookMoveAbility(), BoardPosition(7, 4), 1)
+        game.unmake_move()
+        self.assertIsNone(game.flagged)
+
+    def test_snapshot_keeps_time_control(self):
+        game = create_game(100, TimeControl(increment=5, delay=3))
+        restored = ChessGame.from_snapshot(game.snapshot())
+        self.assertEqual(restored.time_control, TimeControl(increment=5, delay=3))
+        other = create_game(100)
+        other.load_snapshot(game.snapshot())
+        self.assertEqual(other.time_control, TimeControl(increment=5, delay=3))
+
+    def test_move_time_log_grows(self):
+        log = MoveTimeLog(capacity=2)
+        for spent in range(5):
+            log.append(spent)
+        self.assertEqual(len(log), 5)
+        self.assertEqual(log.total(FigureColor.WHITE), 0 + 2 + 4)
+        self.assertEqual(log.total(FigureColor.BLACK), 1 + 3)
+        self.assertEqual(log.pop(), 4)
+        self.assertEqual(log[-1], 3)
+        with self.assertRaises(IndexError):
+            log[4]
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_fires_on_deadline(self):
+        wheel = TimerWheel(tick=1.0, slots=4)
+        fired = []
+        wheel.schedule(2, lambda: fired.append("near"))
+        wheel.schedule(6, lambda: fired.append("far"))
+        wheel.schedule(1, lambda: fired.append("cancelled")).cancel()
+        for _ in range(2):
+            wheel.advance()
+        self.assertEqual(fired, ["near"])
+        for _ in range(4):
+            wheel.advance()
+        self.assertEqual(fired, ["near", "far"])
+
+    def test_failing_callback_does_not_stop_wheel(self):
+        wheel = TimerWheel(tick=1.0, slots=4)
+        fired = []
+        wheel.schedule(1, lambda: 1 / 0)
+        wheel.schedule(1, lambda: fired.append("after"))
+        with self.assertLogs("game_logic.time_control", "ERROR"):
+            wheel.advance()
+        self.assertEqual(fired, ["after"])
+
+
+class TestFlagScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_flag_falls_on_wall_clock(self):
+        wheel = TimerWheel(tick=0.01, slots=16)
+        registry = GameRegistry(shards=2, flags=FlagScheduler(wheel, unit_seconds=0.01))
+        session = registry.create(create_game(100).board, 3)
+        wheel.start()
+        try:
+            version = await asyncio.wait_for(session.wait_changed(session.version), 1)
+        finally:
+            wheel.stop()
+        self.assertEqual(version, 1)
+        self.assertEqual(session.game.flagged, FigureColor.WHITE)
+        self.assertEqual(len(registry.flags), 0)
+
+    async def test_move_rearms_timer(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        registry = GameRegistry(shards=2, flags=FlagScheduler(wheel))
+        session = registry.create(create_game(100).board, 3)
+        await registry.perform_move(session.game_id, BoardPosition(0, 0), "RookMoveAbility", BoardPosition(0, 4), 1)
+        for _ in range(2):
+            wheel.advance()
+        await asyncio.sleep(0)
+        self.assertIsNone(session.game.flagged)
+        wheel.advance()
+        await asyncio.sleep(0)
+        self.assertEqual(session.game.flagged, FigureColor.BLACK)
+        registry.remove(session.game_id)
+        self.assertEqual(len(registry.flags), 0)
+
+    async def test_flag_waits_for_move_in_progress(self):
+        wheel = TimerWheel(tick=1.0, slots=8)
+        registry = GameRegistry(shards=2, flags=FlagScheduler(wheel))
+        session = registry.create(create_game(100).board, 3)
+        async with session.lock:
+            for _ in range(3):
+                wheel.advance()
+            await asyncio.sleep(0)
+            # ход, начатый до срабатывания таймера, успевает завершиться
+            self.assertIsNone(session.game.flagged)
+            session.notify_changed()
+        await asyncio.sleep(0)
+        self.assertIsNone(session.game.flagged)